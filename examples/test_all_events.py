@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Exercise every trace event type and display the resulting JSONL records."""
+
+from __future__ import annotations
+
+import io
+import mmap
+import sys
+from pathlib import Path
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - optional speedup
+    import json
+
+    loads = json.loads
+
+from agent_trace import EVENT_TYPE_VALUES, FileRange, get_tracer
+
+TRACE_FILE = Path(".agent-trace/traces.jsonl")
+SESSION_ID = "example-session"
+MODEL = "claude-sonnet-4-20250514"
+
+
+def emit_all_events() -> None:
+    """Emit one event of every type through the tracer."""
+    tracer = get_tracer(file_export=True, console_export=False)
+
+    tracer.trace_session_start(session_id=SESSION_ID, model=MODEL)
+    tracer.trace_file_create(
+        file_path="src/new_module.py",
+        model=MODEL,
+        tool_name="Write",
+        session_id=SESSION_ID,
+        line_count=42,
+    )
+    tracer.trace_file_edit(
+        file_path="src/main.py",
+        ranges=[FileRange(start_line=10, end_line=25)],
+        model=MODEL,
+        tool_name="Edit",
+        session_id=SESSION_ID,
+    )
+    tracer.trace_file_delete(file_path="src/old_module.py", model=MODEL, session_id=SESSION_ID)
+    tracer.trace_code_review(
+        file_path="src/main.py",
+        ranges=[FileRange(start_line=1, end_line=50)],
+        model=MODEL,
+        session_id=SESSION_ID,
+        review_type="security",
+        findings=["Hardcoded credentials"],
+    )
+    tracer.trace_code_suggestion(
+        file_path="src/utils.py",
+        ranges=[FileRange(start_line=10, end_line=15)],
+        model=MODEL,
+        session_id=SESSION_ID,
+        suggestion_type="autocomplete",
+    )
+    tracer.trace_refactor(
+        file_path="src/service.py",
+        ranges=[FileRange(start_line=20, end_line=40)],
+        model=MODEL,
+        session_id=SESSION_ID,
+        refactor_type="extract_method",
+    )
+    tracer.trace_debug(
+        file_path="src/buggy.py",
+        ranges=[FileRange(start_line=100, end_line=105)],
+        model=MODEL,
+        session_id=SESSION_ID,
+        issue_type="logic",
+        resolved=True,
+    )
+    tracer.trace_test_generate(
+        file_path="tests/test_service.py",
+        ranges=[FileRange(start_line=1, end_line=100)],
+        model=MODEL,
+        session_id=SESSION_ID,
+        test_framework="pytest",
+        test_count=5,
+    )
+    tracer.trace_test_run(
+        model=MODEL,
+        session_id=SESSION_ID,
+        test_file="tests/test_service.py",
+        passed=10,
+        failed=0,
+        skipped=1,
+    )
+    tracer.trace_command_run(
+        command="pytest -v",
+        model=MODEL,
+        session_id=SESSION_ID,
+        exit_code=0,
+    )
+    tracer.trace_custom(
+        event_name="deployment",
+        model=MODEL,
+        session_id=SESSION_ID,
+        metadata={"environment": "staging"},
+    )
+    tracer.trace_session_end(session_id=SESSION_ID, model=MODEL)
+
+
+def count_lines(path: Path, window: int = 1 << 20) -> int:
+    """Count newlines in fixed-size windows, never copying the whole file.
+
+    mmap cannot map an empty file, so zero-length files short-circuit.
+    """
+    if path.stat().st_size == 0:
+        return 0
+    total = 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+        size = len(mm)
+        for start in range(0, size, window):
+            total += mm[start : start + window].count(b"\n")
+    return total
+
+
+def read_tail(path: Path, max_lines: int = 5, window: int = 64 * 1024) -> list[bytes]:
+    """Read the last few lines of a file without loading all of it.
+
+    Seeks to a fixed-size window before EOF, so memory and I/O stay
+    constant no matter how large the trace file grows.
+    """
+    with path.open("rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        f.seek(max(0, size - window))
+        return f.read().splitlines()[-max_lines:]
+
+
+def display_traces() -> None:
+    """Show the last few trace records; only the tail pays decode cost."""
+    if not TRACE_FILE.exists():
+        print("No trace file found.")
+        return
+
+    total = count_lines(TRACE_FILE)
+    tail = read_tail(TRACE_FILE)
+
+    print(f"\n{total} records in {TRACE_FILE}; last {len(tail)}:")
+    for line in tail:
+        record = loads(line)
+        print(f"  {record['event_type']:15s} file={record['file']}")
+
+
+def main() -> None:
+    """Run the demo."""
+    # Block-buffer stdout so the per-event prints coalesce into a few
+    # large writes instead of taking the stdout lock per line.
+    sys.stdout = io.TextIOWrapper(
+        sys.stdout.buffer,
+        encoding="utf-8",
+        line_buffering=False,
+        write_through=False,
+    )
+    try:
+        emit_all_events()
+        display_traces()
+
+        print("\nKnown event types:")
+        for value in EVENT_TYPE_VALUES:
+            print(f"  {value}")
+    finally:
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
 """Agent Trace - OpenTelemetry-based AI code attribution tracking."""
 
 from agent_trace.models import (
+    EVENT_TYPE_SET,
+    EVENT_TYPE_VALUES,
     Contributor,
     ContributorType,
     EventType,
     FileRange,
     HookInput,
     TraceEvent,
+    TraceMetadata,
 )
-from agent_trace.tracer import AgentTracer, get_tracer
+from agent_trace.tracer import AgentTracer, get_default_tracer, get_tracer
 
 __version__ = "0.1.0"
 
 __all__ = [
+    "EVENT_TYPE_SET",
+    "EVENT_TYPE_VALUES",
     "AgentTracer",
     "Contributor",
     "ContributorType",
@@ -20,6 +25,8 @@ __all__ = [
     "FileRange",
     "HookInput",
     "TraceEvent",
+    "TraceMetadata",
     "__version__",
+    "get_default_tracer",
     "get_tracer",
 ]
@@ -1,37 +1,74 @@
 #!/usr/bin/env python3
 """CLI entrypoint for Claude Code hooks."""
 
-import json
-import logging
+import functools
 import sys
 
-from pydantic import ValidationError
+import msgspec
 
 from agent_trace.models import HookInput
-from agent_trace.tracer import get_tracer
+from agent_trace.tracer import TRACKED_HOOK_EVENTS, AgentTracer, get_tracer
 
-logger = logging.getLogger(__name__)
+# Fuses JSON parsing and schema validation into a single pass; built once
+# at import time since this process handles exactly one hook payload.
+_HOOK_DECODER = msgspec.json.Decoder(HookInput)
+
+
+class _EventPeek(msgspec.Struct):
+    """Minimal view of a hook payload: just the event name."""
+
+    hook_event_name: str = ""
+
+
+# Decoding into _EventPeek skips validation of everything but the event
+# name, so ignored events never pay for a full payload decode.
+_PEEK_DECODER = msgspec.json.Decoder(_EventPeek)
+
+
+@functools.cache
+def _get_cli_tracer() -> AgentTracer:
+    """Get the tracer configured for hook invocations, built at most once."""
+    return get_tracer(file_export=True, console_export=False)
 
 
 def main() -> None:
     """Process hook input from stdin and record trace."""
-    # Read JSON from stdin (Claude Code pipes hook data)
-    input_data = sys.stdin.read().strip()
-    if not input_data:
+    # Read raw bytes from stdin (Claude Code pipes hook data); msgspec
+    # decodes bytes directly, so skip the UTF-8 decode a text read pays.
+    raw = sys.stdin.buffer.read()
+    if not raw.strip():
         return
 
     try:
-        data = json.loads(input_data)
-        hook_input = HookInput.model_validate(data)
+        # Cheap peek first: uninteresting events (the common case) return
+        # before the daemon handshake or the full decode.
+        if _PEEK_DECODER.decode(raw).hook_event_name not in TRACKED_HOOK_EVENTS:
+            return
+
+        # A running daemon (see agent_trace.daemon) amortizes tracer
+        # setup across hook invocations; forward the payload if possible.
+        from agent_trace import daemon
+
+        if daemon.forward(raw):
+            return
+        if daemon.spawn_enabled():
+            daemon.spawn()
 
-        tracer = get_tracer(file_export=True, console_export=False)
+        hook_input = _HOOK_DECODER.decode(raw)
+        tracer = _get_cli_tracer()
         tracer.handle_hook(hook_input)
+        # One-shot process: make sure the queued record hits the disk
+        # before we exit.
+        tracer.force_flush()
 
-    except json.JSONDecodeError:
-        logger.exception("Invalid JSON input")
-        sys.exit(1)
-    except ValidationError:
-        logger.exception("Invalid hook input")
+    except msgspec.DecodeError:
+        # msgspec.ValidationError subclasses DecodeError, so this covers
+        # both malformed JSON and schema mismatches. logging is imported
+        # here so the (overwhelmingly common) success path never pays its
+        # import cost at CLI cold start.
+        import logging
+
+        logging.getLogger(__name__).exception("Invalid hook input")
         sys.exit(1)
 
 
@@ -1,22 +1,71 @@
 """Constants for agent trace."""
 
-# Semantic convention attributes for agent traces
-ATTR_CONTRIBUTOR_TYPE = "agent_trace.contributor.type"
-ATTR_MODEL_ID = "agent_trace.contributor.model_id"
-ATTR_EVENT_TYPE = "agent_trace.event.type"
-ATTR_FILE_PATH = "agent_trace.file.path"
-ATTR_RANGE_START = "agent_trace.range.start_line"
-ATTR_RANGE_END = "agent_trace.range.end_line"
-ATTR_CONTENT_HASH = "agent_trace.range.content_hash"
-ATTR_TOOL_NAME = "agent_trace.tool.name"
-ATTR_SESSION_ID = "agent_trace.session.id"
-ATTR_GIT_REVISION = "agent_trace.vcs.revision"
-ATTR_TRANSCRIPT_URL = "agent_trace.conversation.url"
+from sys import intern
+from types import MappingProxyType
+
+# Semantic convention attributes for agent traces. Interned so the
+# per-span attribute dicts hash/compare these keys by identity.
+ATTR_CONTRIBUTOR_TYPE = intern("agent_trace.contributor.type")
+ATTR_MODEL_ID = intern("agent_trace.contributor.model_id")
+ATTR_EVENT_TYPE = intern("agent_trace.event.type")
+ATTR_FILE_PATH = intern("agent_trace.file.path")
+ATTR_RANGE_START = intern("agent_trace.range.start_line")
+ATTR_RANGE_END = intern("agent_trace.range.end_line")
+ATTR_CONTENT_HASH = intern("agent_trace.range.content_hash")
+# All ranges of a span as one JSON-encoded attribute: a list of
+# [start_line, end_line, content_hash] triples (hash "" when unknown).
+# One string attribute serializes far smaller than per-range span
+# events or parallel arrays.
+ATTR_RANGES_JSON = intern("agent_trace.ranges_json")
+ATTR_TOOL_NAME = intern("agent_trace.tool.name")
+ATTR_SESSION_ID = intern("agent_trace.session.id")
+ATTR_GIT_REVISION = intern("agent_trace.vcs.revision")
+ATTR_TRANSCRIPT_URL = intern("agent_trace.conversation.url")
+
+# Prefix for free-form metadata attributes on spans
+ATTR_METADATA_PREFIX = "agent_trace.metadata."
+
+# Metadata keys the trace_* convenience methods are known to emit
+_KNOWN_METADATA_KEYS = (
+    "command",
+    "custom_event_name",
+    "duration_seconds",
+    "environment",
+    "exit_code",
+    "failed",
+    "files_modified",
+    "finding_count",
+    "issue_type",
+    "passed",
+    "prompt",
+    "refactor_type",
+    "resolved",
+    "review_type",
+    "skipped",
+    "success",
+    "suggestion_type",
+    "test_count",
+    "test_framework",
+    "tokens_used",
+    "total",
+    "transcript_url",
+    "version",
+    "working_dir",
+    "workspace",
+)
+
+# Frozen metadata-key -> span-attribute-key table, built once so the hot
+# loop looks attribute names up instead of formatting them per event.
+METADATA_ATTR_KEYS = MappingProxyType({
+    key: intern(ATTR_METADATA_PREFIX + key) for key in _KNOWN_METADATA_KEYS
+})
 
 # Default trace file path
 TRACE_FILE = ".agent-trace/traces.jsonl"
 
 # Environment variable names
+ENV_DAEMON = "AGENT_TRACE_DAEMON"
+ENV_SOCKET = "AGENT_TRACE_SOCKET"
 ENV_OTLP_ENDPOINT = "AGENT_TRACE_OTLP_ENDPOINT"
 ENV_AZURE_CONNECTION_STRING = "APPLICATIONINSIGHTS_CONNECTION_STRING"
 ENV_FILE_EXPORT = "AGENT_TRACE_FILE_EXPORT"
@@ -0,0 +1,208 @@
+"""Long-lived Unix-socket daemon that amortizes tracer setup across hooks.
+
+The CLI forks a fresh Python process per hook invocation, paying
+interpreter startup plus OTel SDK construction every time. When the
+daemon is running, ``cli.main`` just forwards the raw stdin bytes to a
+per-workspace socket under ``$XDG_RUNTIME_DIR`` and exits; the daemon
+decodes and records the event with a single tracer instance built once
+per session. The socket name carries a hash of the workspace root, so a
+daemon only ever receives hooks for the workspace it was started in.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from agent_trace.constants import ENV_DAEMON, ENV_SOCKET
+from agent_trace.utils import get_env_bool, get_workspace_root
+
+# Maximum accepted hook payload; anything larger is malformed.
+_MAX_PAYLOAD = 8 * 1024 * 1024
+
+
+def socket_path(workspace_root: Path | None = None) -> Path:
+    """Resolve the daemon socket path for a workspace.
+
+    The daemon's tracer relativizes paths against (and appends to) one
+    workspace, so the socket is scoped to that workspace: hooks fired in
+    another project resolve a different socket and never reach it.
+
+    Args:
+        workspace_root: The workspace the socket belongs to; resolved
+            from cwd (cached) when omitted.
+
+    Returns:
+        $AGENT_TRACE_SOCKET if set, else
+        agent-trace-{uid}-{workspace hash}.sock under $XDG_RUNTIME_DIR
+        (falling back to the temp directory).
+    """
+    override = os.environ.get(ENV_SOCKET)
+    if override:
+        return Path(override)
+    if workspace_root is None:
+        workspace_root = get_workspace_root()
+    digest = hashlib.sha256(os.fspath(workspace_root).encode()).hexdigest()[:12]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"agent-trace-{os.getuid()}-{digest}.sock"
+
+
+def spawn_enabled() -> bool:
+    """Whether the CLI may auto-spawn a daemon (AGENT_TRACE_DAEMON)."""
+    return get_env_bool(ENV_DAEMON, default=False)
+
+
+def forward(raw: bytes) -> bool:
+    """Try to hand a hook payload to a running daemon.
+
+    Args:
+        raw: The raw JSON bytes read from stdin.
+
+    Returns:
+        True if the daemon accepted the payload; False if no daemon is
+        reachable (caller should fall back to in-process handling).
+    """
+    path = socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(2.0)
+            client.connect(os.fspath(path))
+            client.sendall(raw)
+            client.shutdown(socket.SHUT_WR)
+            # Wait for the one-byte ack so the event is enqueued before
+            # the hook process exits.
+            return client.recv(1) == b"1"
+    except OSError:
+        return False
+
+
+def spawn() -> None:
+    """Double-fork a daemon process serving the socket in the background."""
+    if os.fork() > 0:
+        return
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    try:
+        serve()
+    finally:
+        os._exit(0)
+
+
+def _read_payload(conn: socket.socket) -> bytes:
+    """Read one client's complete payload, bounded by _MAX_PAYLOAD.
+
+    Args:
+        conn: The accepted connection.
+
+    Returns:
+        The raw payload bytes; empty when the payload was oversized.
+    """
+    chunks: list[bytes] = []
+    total = 0
+    while len(raw := conn.recv(65536)) > 0:
+        total += len(raw)
+        if total > _MAX_PAYLOAD:
+            return b""
+        chunks.append(raw)
+    return b"".join(chunks)
+
+
+def _socket_alive(path: Path) -> bool:
+    """Whether a daemon is currently accepting connections on path.
+
+    The probe connects and immediately closes without sending; serve()
+    ignores empty payloads, so a live daemon is not disturbed.
+
+    Args:
+        path: The socket path to probe.
+
+    Returns:
+        True if something accepted the connection; False otherwise.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.settimeout(2.0)
+            probe.connect(os.fspath(path))
+    except OSError:
+        return False
+    return True
+
+
+def serve() -> None:
+    """Accept hook payloads on the socket until terminated."""
+    # Imported here so the forwarding client path never pays for the
+    # tracer (and transitively the OTel SDK).
+    import msgspec
+
+    from agent_trace.models import HookInput
+    from agent_trace.tracer import get_tracer
+
+    decoder = msgspec.json.Decoder(HookInput)
+    tracer = get_tracer(file_export=True, console_export=False)
+
+    def handle_connection(conn: socket.socket) -> None:
+        """Serve one client: read the payload, record it, ack one byte."""
+        with conn:
+            # A client that connects and never sends (or stalls mid-send)
+            # must not wedge the single-threaded accept loop.
+            conn.settimeout(5.0)
+            try:
+                payload = _read_payload(conn)
+                if payload.strip():
+                    tracer.handle_hook(decoder.decode(payload))
+                    conn.sendall(b"1")
+            except (OSError, msgspec.DecodeError):
+                return
+
+    path = socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Two auto-spawns can race to this point; unlinking a live socket
+    # would strand the earlier daemon in accept() forever. Only clear
+    # what nothing answers on (a stale path from an unclean shutdown).
+    if _socket_alive(path):
+        return
+    path.unlink(missing_ok=True)
+
+    # Exit through SystemExit on SIGTERM so the flush/cleanup below runs.
+    # Handlers can only be installed in the main thread; embedded runs
+    # (tests, supervisors) keep the default disposition.
+    def _terminate(_signum: int, _frame: object) -> None:
+        sys.exit(0)
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(os.fspath(path))
+        os.chmod(path, 0o600)
+        server.listen()
+
+        try:
+            while True:
+                conn, _ = server.accept()
+                handle_connection(conn)
+        finally:
+            tracer.force_flush()
+            path.unlink(missing_ok=True)
+
+
+def main() -> None:
+    """Run the daemon in the foreground."""
+    try:
+        serve()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,31 @@
-"""Pydantic models for Agent Trace events."""
+"""Models for Agent Trace events."""
 
+from collections.abc import Iterable
 from enum import StrEnum
-from typing import Annotated
+from sys import intern
+from typing import Annotated, Any, TypedDict
 
-from pydantic import BaseModel, Field
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field, SkipValidation
+
+MetadataValue = str | int | float | bool
+
+
+class TraceMetadata(TypedDict, total=False):
+    """Metadata keys commonly emitted by the tracer convenience methods.
+
+    Events may carry additional free-form keys; this documents the known
+    schema for consumers without forcing validation on producers.
+    """
+
+    workspace: str
+    prompt: str
+    environment: str
+    version: str
+    duration_seconds: float
+    tokens_used: int
+    files_modified: int
+    success: bool
 
 
 class ContributorType(StrEnum):
@@ -44,9 +66,47 @@ class EventType(StrEnum):
     CUSTOM = "custom"
 
 
+# Materialized once so hot paths (dispatch tables, membership checks) avoid
+# re-walking the enum and resolving .value per member.
+EVENT_TYPE_VALUES: tuple[str, ...] = tuple(e.value for e in EventType)
+EVENT_TYPE_SET: frozenset[str] = frozenset(EVENT_TYPE_VALUES)
+
+# Member -> interned value string, computed once. A dict hit replaces the
+# .value descriptor call on every hot-path access, and interned strings
+# compare by identity downstream.
+_EVENT_TYPE_VALUE: dict[EventType, str] = {e: intern(e.value) for e in EventType}
+_CONTRIBUTOR_TYPE_VALUE: dict[ContributorType, str] = {c: intern(c.value) for c in ContributorType}
+
+
+def event_type_value(event_type: EventType | str) -> str:
+    """Get the serialized value for an event type without a descriptor call.
+
+    Args:
+        event_type: An EventType member, or a free-form event name.
+
+    Returns:
+        The interned .value string for members, the string itself otherwise.
+    """
+    return _EVENT_TYPE_VALUE.get(event_type, event_type)  # type: ignore[arg-type]
+
+
+def contributor_type_value(contributor_type: ContributorType) -> str:
+    """Get the serialized value for a contributor type.
+
+    Args:
+        contributor_type: The ContributorType member.
+
+    Returns:
+        The interned .value string.
+    """
+    return _CONTRIBUTOR_TYPE_VALUE[contributor_type]
+
+
 class FileRange(BaseModel):
     """A range of lines in a file."""
 
+    model_config = ConfigDict(frozen=True)
+
     start_line: Annotated[int, Field(ge=1, description="1-indexed start line")]
     end_line: Annotated[int, Field(ge=1, description="1-indexed end line")]
     content_hash: str | None = Field(
@@ -54,10 +114,30 @@ class FileRange(BaseModel):
         description="Hash for position-independent tracking",
     )
 
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, int]]) -> list["FileRange"]:
+        """Bulk-convert (start_line, end_line) pairs to FileRange objects.
+
+        Uses model_construct to skip per-instance validation — intended
+        for hot paths handing over many ranges from trusted sources.
+
+        Args:
+            pairs: Iterable of 1-indexed (start_line, end_line) pairs.
+
+        Returns:
+            The converted ranges.
+        """
+        return [
+            cls.model_construct(start_line=start, end_line=end, content_hash=None)
+            for start, end in pairs
+        ]
+
 
 class Contributor(BaseModel):
     """Attribution contributor info."""
 
+    model_config = ConfigDict(frozen=True)
+
     type: ContributorType = ContributorType.AI
     model_id: str | None = Field(
         default=None,
@@ -67,7 +147,13 @@ class Contributor(BaseModel):
 
 
 class TraceEvent(BaseModel):
-    """An event to be traced."""
+    """An event to be traced.
+
+    Frozen (like the models above) so instances can be shared safely,
+    e.g. hoisted to module constants in callers and tests.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     event_type: str = Field(description="Hook event name (e.g., PostToolUse, SessionStart)")
     file_path: str | None = Field(default=None, description="Relative file path from repo root")
@@ -75,14 +161,21 @@ class TraceEvent(BaseModel):
     contributor: Contributor = Field(default_factory=Contributor)
     tool_name: str | None = Field(default=None, description="Tool that made the change")
     session_id: str | None = Field(default=None, description="Coding session ID")
-    metadata: dict[str, str | int | float | bool] = Field(
+    # SkipValidation: metadata dicts are built internally by the tracer with
+    # known-good value types, so walking the value union per key on every
+    # event construction is pure overhead.
+    metadata: Annotated[dict[str, MetadataValue], SkipValidation] = Field(
         default_factory=dict,
         description="Additional context",
     )
 
 
-class HookInput(BaseModel):
-    """Input from Claude Code hooks (matches their JSON schema)."""
+class HookInput(msgspec.Struct, frozen=True):
+    """Input from Claude Code hooks (matches their JSON schema).
+
+    Decoded with msgspec so the CLI hot path parses and validates stdin
+    JSON in a single pass without an intermediate dict.
+    """
 
     hook_event_name: str
     model: str | None = None
@@ -93,3 +186,8 @@ class HookInput(BaseModel):
     tool_use_id: str | None = None
     tool_input: dict[str, str | int | None] | None = None
     cwd: str | None = None
+
+    @classmethod
+    def model_validate(cls, data: Any) -> "HookInput":
+        """Validate a mapping into a HookInput (pydantic-compatible shim)."""
+        return msgspec.convert(data, cls)
@@ -3,50 +3,121 @@
 from __future__ import annotations
 
 import os
-from collections.abc import Mapping
-from functools import lru_cache
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from functools import cache, lru_cache
 from typing import TYPE_CHECKING
 
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.semconv.attributes import service_attributes
-from opentelemetry.trace import Status, StatusCode
-
 from agent_trace.constants import (
-    ATTR_CONTENT_HASH,
     ATTR_CONTRIBUTOR_TYPE,
     ATTR_FILE_PATH,
     ATTR_GIT_REVISION,
+    ATTR_METADATA_PREFIX,
     ATTR_MODEL_ID,
-    ATTR_RANGE_END,
-    ATTR_RANGE_START,
+    ATTR_RANGES_JSON,
     ATTR_SESSION_ID,
     ATTR_TOOL_NAME,
     ENV_AZURE_CONNECTION_STRING,
     ENV_CONSOLE_EXPORT,
     ENV_FILE_EXPORT,
     ENV_OTLP_ENDPOINT,
+    METADATA_ATTR_KEYS,
+)
+from agent_trace.models import (
+    Contributor,
+    ContributorType,
+    EventType,
+    FileRange,
+    HookInput,
+    TraceEvent,
+    contributor_type_value,
 )
-from agent_trace.models import ContributorType, EventType, FileRange, HookInput, TraceEvent
 from agent_trace.utils import (
+    TraceFileWriter,
+    build_event_record,
+    dumps_str,
     get_env_bool,
     get_git_revision,
     get_workspace_root,
+    hash_content,
+    make_record_template,
     normalize_model_id,
     to_relative_path,
-    write_event_record,
 )
 
 if TYPE_CHECKING:
-    pass
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.trace import Tracer
+
+# Hook events and tools that produce trace records; everything else is
+# ignored as early as possible.
+TRACKED_HOOK_EVENTS = frozenset({"PostToolUse", "afterFileEdit", "afterTabFileEdit"})
+TRACKED_TOOLS = frozenset({"Write", "Edit"})
+
+# High-throughput BatchSpanProcessor defaults for bursty agent traffic;
+# the SDK defaults (2048/512/5000) under-batch when many events arrive
+# in quick succession.
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_MAX_EXPORT_BATCH_SIZE = 2048
+DEFAULT_SCHEDULE_DELAY_MILLIS = 2000
+
+# Export defaults resolved once at import time; repeated get_tracer
+# calls never re-read the environment.
+_DEFAULT_CONSOLE_EXPORT = get_env_bool(ENV_CONSOLE_EXPORT, default=False)
+_DEFAULT_FILE_EXPORT = get_env_bool(ENV_FILE_EXPORT, default=True)
+_DEFAULT_OTLP_ENDPOINT = os.environ.get(ENV_OTLP_ENDPOINT)
+_DEFAULT_AZURE_CONNECTION_STRING = os.environ.get(ENV_AZURE_CONNECTION_STRING)
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer env var, falling back on absence or bad values."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+@cache
+def _get_resource(service_name: str, git_revision: str | None = None) -> Resource:
+    """Build (once per configuration) the OTel resource for the tracer.
+
+    Process-invariant attributes like the git revision belong here:
+    exporters serialize the Resource once per batch instead of once per
+    span.
+
+    Args:
+        service_name: Name of the service for the OTel resource.
+        git_revision: Current git SHA, fixed for the process lifetime.
+
+    Returns:
+        The cached Resource instance.
+    """
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.semconv.attributes import service_attributes
+
+    attributes: dict[str, str] = {
+        service_attributes.SERVICE_NAME: service_name,
+        service_attributes.SERVICE_VERSION: "1.0.0",
+    }
+    if git_revision:
+        attributes[ATTR_GIT_REVISION] = git_revision
+    return Resource.create(attributes)
 
 
 class AgentTracer:
     """Tracer for AI code attribution using OpenTelemetry."""
 
-    def __init__(
+    # Bound on the class so handle_hook's membership checks resolve via
+    # the instance without a module-global dict lookup.
+    _TRACKED_EVENTS = TRACKED_HOOK_EVENTS
+    _TRACKED_TOOLS = TRACKED_TOOLS
+
+    # The exporter/batching knobs are independent keyword-only options;
+    # bundling them into a config object would just move the arguments.
+    def __init__(  # ruff: ignore[too-many-arguments]
         self,
         service_name: str = "agent-trace",
         *,
@@ -54,6 +125,9 @@ class AgentTracer:
         file_export: bool = True,
         otlp_endpoint: str | None = None,
         azure_connection_string: str | None = None,
+        max_queue_size: int | None = None,
+        max_export_batch_size: int | None = None,
+        schedule_delay_millis: int | None = None,
     ) -> None:
         """Initialize the tracer.
 
@@ -63,34 +137,114 @@ class AgentTracer:
             file_export: Whether to write traces to .agent-trace/traces.jsonl.
             otlp_endpoint: Optional OTLP endpoint for production export.
             azure_connection_string: Optional Azure Application Insights connection string.
+            max_queue_size: BatchSpanProcessor queue size
+                (env: OTEL_BSP_MAX_QUEUE_SIZE).
+            max_export_batch_size: Spans exported per batch
+                (env: OTEL_BSP_MAX_EXPORT_BATCH_SIZE).
+            schedule_delay_millis: Delay between batch exports
+                (env: OTEL_BSP_SCHEDULE_DELAY).
         """
         self._workspace_root = get_workspace_root()
+        # Captured once; every trace_event call reads the attribute
+        # instead of re-invoking (even the cached) lookup.
+        self._git_revision = get_git_revision()
+        # Static record fields, copied per event instead of rebuilt.
+        self._record_template = make_record_template(self._git_revision)
         self._file_export = file_export
+        self._writer = TraceFileWriter(self._workspace_root) if file_export else None
+
+        # Only pull in (and pay the import cost of) the OTel SDK when a
+        # span exporter is actually configured; JSONL-only tracers skip
+        # provider construction entirely.
+        self._otel_enabled = bool(console_export or otlp_endpoint or azure_connection_string)
+        self._tracer: Tracer | None = None
+        if self._otel_enabled:
+            self._tracer = self._build_provider(
+                service_name,
+                console_export=console_export,
+                otlp_endpoint=otlp_endpoint,
+                azure_connection_string=azure_connection_string,
+                max_queue_size=max_queue_size,
+                max_export_batch_size=max_export_batch_size,
+                schedule_delay_millis=schedule_delay_millis,
+            )
+
+    def _build_provider(
+        self,
+        service_name: str,
+        *,
+        console_export: bool,
+        otlp_endpoint: str | None,
+        azure_connection_string: str | None,
+        max_queue_size: int | None,
+        max_export_batch_size: int | None,
+        schedule_delay_millis: int | None,
+    ) -> Tracer:
+        """Construct and install the SDK tracer provider.
+
+        The SDK imports live here so one-shot CLI invocations that only
+        write JSONL never load them.
 
-        resource = Resource.create({
-            service_attributes.SERVICE_NAME: service_name,
-            service_attributes.SERVICE_VERSION: "1.0.0",
-        })
-
-        provider = TracerProvider(resource=resource)
+        Args:
+            service_name: Name of the service for the OTel resource.
+            console_export: Whether to attach the console exporter.
+            otlp_endpoint: Optional OTLP endpoint.
+            azure_connection_string: Optional Azure connection string.
+            max_queue_size: BatchSpanProcessor queue size.
+            max_export_batch_size: Spans exported per batch.
+            schedule_delay_millis: Delay between batch exports.
+
+        Returns:
+            The tracer backed by the new provider.
+        """
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        # Explicit kwargs win; otherwise honor the standard OTEL_BSP_*
+        # variables before falling back to our defaults.
+        if max_queue_size is None:
+            max_queue_size = _env_int("OTEL_BSP_MAX_QUEUE_SIZE", DEFAULT_MAX_QUEUE_SIZE)
+        if max_export_batch_size is None:
+            max_export_batch_size = _env_int(
+                "OTEL_BSP_MAX_EXPORT_BATCH_SIZE", DEFAULT_MAX_EXPORT_BATCH_SIZE
+            )
+        if schedule_delay_millis is None:
+            schedule_delay_millis = _env_int(
+                "OTEL_BSP_SCHEDULE_DELAY", DEFAULT_SCHEDULE_DELAY_MILLIS
+            )
+
+        def batch_processor(exporter: object) -> BatchSpanProcessor:
+            return BatchSpanProcessor(
+                exporter,  # type: ignore[arg-type]
+                max_queue_size=max_queue_size,
+                max_export_batch_size=max_export_batch_size,
+                schedule_delay_millis=schedule_delay_millis,
+            )
+
+        provider = TracerProvider(resource=_get_resource(service_name, self._git_revision))
 
         if console_export:
-            provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+            provider.add_span_processor(batch_processor(ConsoleSpanExporter()))
 
         if otlp_endpoint:
             from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
-            otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
-            provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+            provider.add_span_processor(batch_processor(OTLPSpanExporter(endpoint=otlp_endpoint)))
 
         if azure_connection_string:
             from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
 
             azure_exporter = AzureMonitorTraceExporter(connection_string=azure_connection_string)
-            provider.add_span_processor(BatchSpanProcessor(azure_exporter))
+            provider.add_span_processor(batch_processor(azure_exporter))
 
-        trace.set_tracer_provider(provider)
-        self._tracer = trace.get_tracer(__name__)
+        # Install as the global provider only if none has been set yet;
+        # re-registering would silently detach spans from whatever the
+        # host application already configured. Our spans go through this
+        # provider directly either way.
+        if isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+            trace.set_tracer_provider(provider)
+        return provider.get_tracer(__name__)
 
     def trace_event(self, event: TraceEvent) -> None:
         """Record a trace event as an OTel span and optionally to JSONL file.
@@ -98,53 +252,117 @@ class AgentTracer:
         Args:
             event: The trace event to record.
         """
-        # Write to JSONL file if enabled
-        if self._file_export:
-            write_event_record(event, self._workspace_root)
+        # Relativized once here and shared by the JSONL record and the
+        # span attributes below.
+        relative_path = (
+            to_relative_path(event.file_path, self._workspace_root) if event.file_path else None
+        )
+
+        # Queue for JSONL file export if enabled; the background writer
+        # batches appends so this stays an in-memory operation.
+        if self._writer is not None:
+            self._writer.enqueue(
+                build_event_record(
+                    event,
+                    self._workspace_root,
+                    template=self._record_template,
+                    relative_path=relative_path,
+                )
+            )
+
+        # JSONL-only tracers have no provider; skip span assembly outright.
+        if self._tracer is None:
+            return
 
         # Emit OTel span
         with self._tracer.start_as_current_span(
             name=f"agent.{event.event_type}",
         ) as span:
-            span.set_attribute(ATTR_CONTRIBUTOR_TYPE, event.contributor.type.value)
+            # One set_attributes call enters the SDK once instead of once
+            # per attribute.
+            attrs: dict[str, str | int | float | bool] = {
+                ATTR_CONTRIBUTOR_TYPE: contributor_type_value(event.contributor.type),
+            }
 
             if event.contributor.model_id:
-                span.set_attribute(ATTR_MODEL_ID, event.contributor.model_id)
+                attrs[ATTR_MODEL_ID] = event.contributor.model_id
 
-            if event.file_path:
-                relative_path = to_relative_path(event.file_path, self._workspace_root)
-                span.set_attribute(ATTR_FILE_PATH, relative_path)
+            if relative_path:
+                attrs[ATTR_FILE_PATH] = relative_path
 
             if event.tool_name:
-                span.set_attribute(ATTR_TOOL_NAME, event.tool_name)
+                attrs[ATTR_TOOL_NAME] = event.tool_name
 
             if event.session_id:
-                span.set_attribute(ATTR_SESSION_ID, event.session_id)
-
-            revision = get_git_revision()
-            if revision:
-                span.set_attribute(ATTR_GIT_REVISION, revision)
-
-            for i, range_ in enumerate(event.ranges):
-                span.add_event(
-                    name=f"range.{i}",
-                    attributes={
-                        ATTR_RANGE_START: range_.start_line,
-                        ATTR_RANGE_END: range_.end_line,
-                        **({ATTR_CONTENT_HASH: range_.content_hash} if range_.content_hash else {}),
-                    },
-                )
+                attrs[ATTR_SESSION_ID] = event.session_id
+
+            # Ranges travel as one JSON string of [start, end, hash]
+            # triples — a single attribute on the wire instead of
+            # per-range span events or parallel arrays.
+            if event.ranges:
+                attrs[ATTR_RANGES_JSON] = dumps_str([
+                    [r.start_line, r.end_line, r.content_hash or ""] for r in event.ranges
+                ])
+
+            # Custom metadata joins the same dict; known keys hit the
+            # precomputed table, only novel ones pay for string
+            # formatting.
+            if event.metadata:
+                for key, value in event.metadata.items():
+                    attrs[METADATA_ATTR_KEYS.get(key) or ATTR_METADATA_PREFIX + key] = value
+
+            span.set_attributes(attrs)
+
+    def _emit(
+        self,
+        event_type: EventType,
+        *,
+        file_path: str | None = None,
+        ranges: list[FileRange] | list[tuple[int, int]] | None = None,
+        model: str | None = None,
+        tool_name: str | None = None,
+        session_id: str | None = None,
+        metadata: dict[str, str | int | float | bool] | None = None,
+    ) -> None:
+        """Build a TraceEvent from raw fields and record it.
 
-            # Custom metadata
-            for key, value in event.metadata.items():
-                span.set_attribute(f"agent_trace.metadata.{key}", value)
+        Single construction point shared by all trace_* convenience
+        methods, so the model normalization and event assembly happen in
+        exactly one place per call.
 
-            span.set_status(Status(StatusCode.OK))
+        Args:
+            event_type: The type of event to record.
+            file_path: Optional file path associated with the event.
+            ranges: Optional line ranges.
+            model: Raw model ID (normalized here).
+            tool_name: Tool that made the change.
+            session_id: Coding session ID.
+            metadata: Additional metadata.
+        """
+        if ranges and not isinstance(ranges[0], FileRange):
+            ranges = FileRange.from_pairs(ranges)  # type: ignore[arg-type]
+
+        # model_construct: every field here is built from known-good
+        # values, so pydantic validation would be pure overhead.
+        # Externally-sourced events still validate via TraceEvent(...).
+        event = TraceEvent.model_construct(
+            event_type=event_type,
+            file_path=file_path,
+            ranges=ranges or [],
+            contributor=Contributor.model_construct(
+                type=ContributorType.AI,
+                model_id=normalize_model_id(model),
+            ),
+            tool_name=tool_name,
+            session_id=session_id,
+            metadata=metadata or {},
+        )
+        self.trace_event(event)
 
     def trace_file_edit(
         self,
         file_path: str,
-        ranges: list[FileRange],
+        ranges: list[FileRange] | list[tuple[int, int]],
         *,
         model: str | None = None,
         tool_name: str | None = None,
@@ -155,29 +373,23 @@ class AgentTracer:
 
         Args:
             file_path: Path to the edited file.
-            ranges: Line ranges that were edited.
+            ranges: Line ranges that were edited, as FileRange objects or
+                plain (start_line, end_line) pairs (converted without
+                per-range validation).
             model: Model ID that made the edit.
             tool_name: Tool name (e.g., "Write", "Edit").
             session_id: Coding session ID.
             transcript_url: URL to conversation transcript.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
-
-        event = TraceEvent(
-            event_type=EventType.FILE_EDIT,
+        self._emit(
+            EventType.FILE_EDIT,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(
-                type=ContributorType.AI,
-                model_id=model_id,
-            ),
+            model=model,
             tool_name=tool_name,
             session_id=session_id,
-            metadata={"transcript_url": transcript_url} if transcript_url else {},
+            metadata={"transcript_url": transcript_url} if transcript_url else None,
         )
-        self.trace_event(event)
 
     def trace_file_create(
         self,
@@ -197,20 +409,16 @@ class AgentTracer:
             session_id: Coding session ID.
             line_count: Number of lines in the created file.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         ranges = [FileRange(start_line=1, end_line=max(1, line_count))] if line_count else []
 
-        event = TraceEvent(
-            event_type=EventType.FILE_CREATE,
+        self._emit(
+            EventType.FILE_CREATE,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             tool_name=tool_name,
             session_id=session_id,
         )
-        self.trace_event(event)
 
     def trace_file_delete(
         self,
@@ -228,19 +436,13 @@ class AgentTracer:
             tool_name: Tool name (e.g., "Delete").
             session_id: Coding session ID.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
-
-        event = TraceEvent(
-            event_type=EventType.FILE_DELETE,
+        self._emit(
+            EventType.FILE_DELETE,
             file_path=file_path,
-            ranges=[],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             tool_name=tool_name,
             session_id=session_id,
         )
-        self.trace_event(event)
 
     def trace_session_start(
         self,
@@ -256,18 +458,12 @@ class AgentTracer:
             model: Model ID used in the session.
             metadata: Additional session metadata (e.g., workspace, prompt).
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
-
-        event = TraceEvent(
-            event_type=EventType.SESSION_START,
-            ranges=[],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+        self._emit(
+            EventType.SESSION_START,
+            model=model,
             session_id=session_id,
-            metadata=dict(metadata) if metadata else {},
+            metadata=dict(metadata) if metadata else None,
         )
-        self.trace_event(event)
 
     def trace_session_end(
         self,
@@ -283,18 +479,12 @@ class AgentTracer:
             model: Model ID used in the session.
             metadata: Additional session metadata (e.g., duration, tokens).
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
-
-        event = TraceEvent(
-            event_type=EventType.SESSION_END,
-            ranges=[],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+        self._emit(
+            EventType.SESSION_END,
+            model=model,
             session_id=session_id,
-            metadata=dict(metadata) if metadata else {},
+            metadata=dict(metadata) if metadata else None,
         )
-        self.trace_event(event)
 
     def trace_code_review(
         self,
@@ -316,24 +506,20 @@ class AgentTracer:
             review_type: Type of review (e.g., "security", "style", "performance").
             findings: List of review findings/comments.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {}
         if review_type:
             metadata["review_type"] = review_type
         if findings:
             metadata["finding_count"] = len(findings)
 
-        event = TraceEvent(
-            event_type=EventType.CODE_REVIEW,
+        self._emit(
+            EventType.CODE_REVIEW,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_code_suggestion(
         self,
@@ -353,22 +539,18 @@ class AgentTracer:
             session_id: Coding session ID.
             suggestion_type: Type of suggestion (e.g., "autocomplete", "inline").
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {}
         if suggestion_type:
             metadata["suggestion_type"] = suggestion_type
 
-        event = TraceEvent(
-            event_type=EventType.CODE_SUGGEST,
+        self._emit(
+            EventType.CODE_SUGGEST,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_refactor(
         self,
@@ -388,22 +570,18 @@ class AgentTracer:
             session_id: Coding session ID.
             refactor_type: Type of refactoring (e.g., "rename", "extract", "inline").
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {}
         if refactor_type:
             metadata["refactor_type"] = refactor_type
 
-        event = TraceEvent(
-            event_type=EventType.REFACTOR,
+        self._emit(
+            EventType.REFACTOR,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_debug(
         self,
@@ -425,22 +603,18 @@ class AgentTracer:
             issue_type: Type of issue debugged (e.g., "error", "warning", "logic").
             resolved: Whether the issue was resolved.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {"resolved": resolved}
         if issue_type:
             metadata["issue_type"] = issue_type
 
-        event = TraceEvent(
-            event_type=EventType.DEBUG,
+        self._emit(
+            EventType.DEBUG,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_test_generate(
         self,
@@ -462,24 +636,20 @@ class AgentTracer:
             test_framework: Test framework used (e.g., "pytest", "jest").
             test_count: Number of tests generated.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {}
         if test_framework:
             metadata["test_framework"] = test_framework
         if test_count is not None:
             metadata["test_count"] = test_count
 
-        event = TraceEvent(
-            event_type=EventType.TEST_GENERATE,
+        self._emit(
+            EventType.TEST_GENERATE,
             file_path=file_path,
             ranges=ranges,
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_test_run(
         self,
@@ -501,9 +671,6 @@ class AgentTracer:
             failed: Number of tests failed.
             skipped: Number of tests skipped.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {
             "passed": passed,
             "failed": failed,
@@ -511,15 +678,13 @@ class AgentTracer:
             "total": passed + failed + skipped,
         }
 
-        event = TraceEvent(
-            event_type=EventType.TEST_RUN,
+        self._emit(
+            EventType.TEST_RUN,
             file_path=test_file,
-            ranges=[],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_command_run(
         self,
@@ -539,23 +704,18 @@ class AgentTracer:
             exit_code: Command exit code.
             working_dir: Working directory for the command.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         metadata: dict[str, str | int | float | bool] = {"command": command}
         if exit_code is not None:
             metadata["exit_code"] = exit_code
         if working_dir:
             metadata["working_dir"] = working_dir
 
-        event = TraceEvent(
-            event_type=EventType.COMMAND_RUN,
-            ranges=[],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+        self._emit(
+            EventType.COMMAND_RUN,
+            model=model,
             session_id=session_id,
             metadata=metadata,
         )
-        self.trace_event(event)
 
     def trace_custom(
         self,
@@ -577,22 +737,48 @@ class AgentTracer:
             session_id: Coding session ID.
             metadata: Additional metadata.
         """
-        from agent_trace.models import Contributor
-
-        model_id = normalize_model_id(model)
         event_metadata: dict[str, str | int | float | bool] = {"custom_event_name": event_name}
         if metadata:
             event_metadata |= metadata
 
-        event = TraceEvent(
-            event_type=EventType.CUSTOM,
+        self._emit(
+            EventType.CUSTOM,
             file_path=file_path,
-            ranges=ranges or [],
-            contributor=Contributor(type=ContributorType.AI, model_id=model_id),
+            ranges=ranges,
+            model=model,
             session_id=session_id,
             metadata=event_metadata,
         )
-        self.trace_event(event)
+
+    @contextmanager
+    def batch_writes(self, timeout: float = 5.0) -> Generator[None, None, None]:
+        """Group file-export records emitted in the block into one flush.
+
+        Records enqueued inside the block coalesce in the background
+        writer and are committed with a single write on exit, instead of
+        relying on the timed flush to pick them up later.
+
+        Args:
+            timeout: Maximum seconds to wait for the closing flush.
+        """
+        try:
+            yield
+        finally:
+            if self._writer is not None:
+                self._writer.force_flush(timeout)
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        """Block until all queued file-export records are on disk.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            True if the flush completed (or file export is disabled).
+        """
+        if self._writer is None:
+            return True
+        return self._writer.force_flush(timeout)
 
     def handle_hook(self, hook_input: HookInput) -> None:
         """Handle a Claude Code hook input.
@@ -600,14 +786,13 @@ class AgentTracer:
         Args:
             hook_input: The hook input from Claude Code.
         """
-        event_type = hook_input.hook_event_name
-
-        # Only trace file-modifying events
-        if event_type not in {"PostToolUse", "afterFileEdit", "afterTabFileEdit"}:
+        # Only trace file-modifying events; dropped hooks (the majority)
+        # exit on these two checks before any other work.
+        if hook_input.hook_event_name not in self._TRACKED_EVENTS:
             return
 
         tool_name = hook_input.tool_name or ""
-        if tool_name not in {"Write", "Edit"}:
+        if tool_name not in self._TRACKED_TOOLS:
             return
 
         file_path = hook_input.file_path
@@ -620,9 +805,17 @@ class AgentTracer:
         # Compute ranges from new_string if available
         ranges: list[FileRange] = []
         if hook_input.tool_input and hook_input.tool_input.get("new_string"):
-            new_string = str(hook_input.tool_input["new_string"])
-            line_count = new_string.count("\n") + 1
-            ranges.append(FileRange(start_line=1, end_line=line_count))
+            # Encode once and share the bytes: hashing needs them anyway,
+            # and bytes.count is a raw C scan with no UTF-8 state to
+            # track, which matters for multi-megabyte writes.
+            new_bytes = str(hook_input.tool_input["new_string"]).encode()
+            ranges.append(
+                FileRange(
+                    start_line=1,
+                    end_line=new_bytes.count(b"\n") + 1,
+                    content_hash=hash_content(new_bytes),
+                )
+            )
 
         transcript_url = (
             f"file://{hook_input.transcript_path}" if hook_input.transcript_path else None
@@ -639,6 +832,21 @@ class AgentTracer:
 
 
 @lru_cache(maxsize=1)
+def _build_tracer(
+    console_export: bool,  # ruff: ignore[boolean-type-hint-positional-argument]
+    file_export: bool,  # ruff: ignore[boolean-type-hint-positional-argument]
+    otlp_endpoint: str | None,
+    azure_connection_string: str | None,
+) -> AgentTracer:
+    """Build (once per resolved configuration) the shared tracer."""
+    return AgentTracer(
+        console_export=console_export,
+        file_export=file_export,
+        otlp_endpoint=otlp_endpoint,
+        azure_connection_string=azure_connection_string,
+    )
+
+
 def get_tracer(
     *,
     console_export: bool | None = None,
@@ -648,6 +856,10 @@ def get_tracer(
 ) -> AgentTracer:
     """Get the singleton AgentTracer instance.
 
+    The cache is keyed on the *resolved* configuration, so env-driven
+    and equivalent kwarg-driven calls share one instance instead of one
+    per kwarg spelling.
+
     Args:
         console_export: Whether to export to console (env: AGENT_TRACE_CONSOLE_EXPORT).
         file_export: Whether to write to .agent-trace/traces.jsonl (env: AGENT_TRACE_FILE_EXPORT).
@@ -658,20 +870,22 @@ def get_tracer(
     Returns:
         The AgentTracer singleton.
     """
-    resolved_console = (
-        console_export
-        if console_export is not None
-        else get_env_bool(ENV_CONSOLE_EXPORT, default=False)
-    )
-    resolved_file = (
-        file_export if file_export is not None else get_env_bool(ENV_FILE_EXPORT, default=True)
-    )
-    resolved_otlp = otlp_endpoint or os.environ.get(ENV_OTLP_ENDPOINT)
-    resolved_azure = azure_connection_string or os.environ.get(ENV_AZURE_CONNECTION_STRING)
+    resolved_console = console_export if console_export is not None else _DEFAULT_CONSOLE_EXPORT
+    resolved_file = file_export if file_export is not None else _DEFAULT_FILE_EXPORT
+    resolved_otlp = otlp_endpoint or _DEFAULT_OTLP_ENDPOINT
+    resolved_azure = azure_connection_string or _DEFAULT_AZURE_CONNECTION_STRING
 
-    return AgentTracer(
-        console_export=resolved_console,
-        file_export=resolved_file,
-        otlp_endpoint=resolved_otlp,
-        azure_connection_string=resolved_azure,
-    )
+    return _build_tracer(resolved_console, resolved_file, resolved_otlp, resolved_azure)
+
+
+@lru_cache(maxsize=1)
+def get_default_tracer() -> AgentTracer:
+    """Get the env-configured singleton tracer with zero argument plumbing.
+
+    Hot callers (hook handlers) hit the lru_cache on an empty key tuple,
+    skipping even the kwarg resolution get_tracer performs.
+
+    Returns:
+        The AgentTracer singleton built from environment defaults.
+    """
+    return get_tracer()
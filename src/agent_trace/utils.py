@@ -2,16 +2,93 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
+import hashlib
 import json
 import os
+import queue
 import shutil
-import subprocess  # noqa: S404
-from datetime import UTC, datetime
+import subprocess  # ruff: ignore[suspicious-subprocess-import]
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from uuid import uuid4
 
 from agent_trace.constants import TRACE_FILE
-from agent_trace.models import TraceEvent
+from agent_trace.models import TraceEvent, contributor_type_value, event_type_value
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Vectored writes flush a batch without concatenating it first.
+_HAS_WRITEV = hasattr(os, "writev")
+
+
+def _iov_max() -> int:
+    """Best-effort IOV_MAX; writev batches are chunked to this many buffers."""
+    try:
+        return os.sysconf("SC_IOV_MAX")
+    except (AttributeError, OSError, ValueError):  # pragma: no cover - platform-specific
+        return 1024
+
+
+_IOV_MAX = _iov_max()
+
+
+def _json_default(obj: object) -> str:
+    """Serialize types stdlib json lacks native support for (datetime)."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    msg = f"Object of type {type(obj).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def dumps_str(obj: object) -> str:
+    """Serialize a value to a compact JSON string.
+
+    Args:
+        obj: The value to serialize.
+
+    Returns:
+        The JSON text, without trailing newline.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+
+def dumps_line(record: dict[str, object]) -> bytes:
+    """Serialize a record to one newline-terminated JSONL line.
+
+    Uses orjson when available (native code, emits bytes directly, and
+    formats datetime values without a Python-side isoformat call); falls
+    back to stdlib json otherwise.
+
+    Args:
+        record: The record dict to serialize.
+
+    Returns:
+        The serialized line including the trailing newline.
+    """
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (
+        json.dumps(
+            record, separators=(",", ":"), ensure_ascii=False, default=_json_default
+        ).encode()
+        + b"\n"
+    )
+
+
+# Accepted truthy spellings for boolean env vars; built once rather
+# than as a set literal inside every get_env_bool call.
+_TRUTHY = frozenset({"true", "1", "yes"})
 
 
 def get_env_bool(name: str, *, default: bool) -> bool:
@@ -27,9 +104,10 @@ def get_env_bool(name: str, *, default: bool) -> bool:
     value = os.environ.get(name)
     if value is None:
         return default
-    return value.lower() in {"true", "1", "yes"}
+    return value.lower() in _TRUTHY
 
 
+@lru_cache(maxsize=1)
 def find_git() -> str | None:
     """Find the git executable path.
 
@@ -39,17 +117,81 @@ def find_git() -> str | None:
     return shutil.which("git")
 
 
+@lru_cache(maxsize=1)
+def _find_git_dir() -> Path | None:
+    """Walk up from cwd to the nearest .git directory.
+
+    Worktrees and submodules use a .git *file* instead; those fall back
+    to the subprocess path.
+
+    Returns:
+        The .git directory, or None if no plain one was found.
+    """
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        git_dir = directory / ".git"
+        if git_dir.is_dir():
+            return git_dir
+    return None
+
+
+def _read_git_head(git_dir: Path) -> str | None:
+    """Resolve HEAD by reading the ref files directly, no subprocess.
+
+    Args:
+        git_dir: The .git directory.
+
+    Returns:
+        The commit SHA, or None if the manual read did not resolve
+        (e.g. the ref only exists in packed-refs).
+    """
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        # Detached HEAD stores the SHA inline.
+        return head or None
+
+    ref = head.removeprefix("ref: ")
+    try:
+        return (git_dir / ref).read_text().strip() or None
+    except OSError:
+        pass
+    # Recently-packed refs have no loose file; scan packed-refs.
+    try:
+        packed = (git_dir / "packed-refs").read_text()
+    except OSError:
+        return None
+    for line in packed.splitlines():
+        if line.endswith(ref) and not line.startswith(("#", "^")):
+            return line.split(" ", 1)[0]
+    return None
+
+
+@lru_cache(maxsize=1)
 def get_git_revision() -> str | None:
-    """Get current git commit SHA.
+    """Get current git commit SHA, cached for the process lifetime.
+
+    Reads .git/HEAD (and the ref it points to) directly — a couple of
+    file reads instead of a ~10ms fork+exec. The subprocess path
+    remains as fallback for layouts the manual read can't resolve
+    (worktrees, unusual ref setups).
 
     Returns:
         Git commit SHA or None if not in a git repo.
     """
+    git_dir = _find_git_dir()
+    if git_dir is not None:
+        revision = _read_git_head(git_dir)
+        if revision:
+            return revision
+
     git_path = find_git()
     if not git_path:
         return None
     try:
-        result = subprocess.run(  # noqa: S603
+        result = subprocess.run(  # ruff: ignore[subprocess-without-shell-equals-true]
             [git_path, "rev-parse", "HEAD"],
             capture_output=True,
             text=True,
@@ -60,17 +202,25 @@ def get_git_revision() -> str | None:
         return None
 
 
+@lru_cache(maxsize=1)
 def get_workspace_root() -> Path:
-    """Get the workspace root directory.
+    """Get the workspace root directory, cached for the process lifetime.
+
+    The directory containing .git is found by walking up from cwd;
+    git itself is only consulted when no plain .git directory exists.
 
     Returns:
         Path to workspace root (git root or cwd).
     """
+    git_dir = _find_git_dir()
+    if git_dir is not None:
+        return git_dir.parent
+
     git_path = find_git()
     if not git_path:
         return Path.cwd()
     try:
-        result = subprocess.run(  # noqa: S603
+        result = subprocess.run(  # ruff: ignore[subprocess-without-shell-equals-true]
             [git_path, "rev-parse", "--show-toplevel"],
             capture_output=True,
             text=True,
@@ -81,9 +231,26 @@ def get_workspace_root() -> Path:
         return Path.cwd()
 
 
+# Known model-ID prefixes and their providers. str.startswith with a
+# tuple is a single C-level multi-prefix match, so unknown models (and
+# the guard below) never enter the Python loop.
+_PROVIDER_PREFIXES = (
+    ("claude-", "anthropic"),
+    ("gpt-", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("gemini-", "google"),
+)
+_PREFIX_KEYS = tuple(prefix for prefix, _ in _PROVIDER_PREFIXES)
+
+
+@lru_cache(maxsize=256)
 def normalize_model_id(model: str | None) -> str | None:
     """Normalize model ID to provider/model format.
 
+    The same model string recurs for every event in a session, so
+    results are memoized.
+
     Args:
         model: Raw model ID (e.g., "claude-sonnet-4-20250514").
 
@@ -94,23 +261,66 @@ def normalize_model_id(model: str | None) -> str | None:
         return None
     if "/" in model:
         return model
+    if not model.startswith(_PREFIX_KEYS):
+        return model
 
-    prefixes = {
-        "claude-": "anthropic",
-        "gpt-": "openai",
-        "o1": "openai",
-        "o3": "openai",
-        "gemini-": "google",
-    }
-    for prefix, provider in prefixes.items():
+    for prefix, provider in _PROVIDER_PREFIXES:
         if model.startswith(prefix):
             return f"{provider}/{model}"
-    return model
+    return model  # pragma: no cover - unreachable after the tuple guard
+
+
+def hash_content(data: bytes) -> str:
+    """Hash a range payload for position-independent tracking.
+
+    Args:
+        data: The raw range content.
+
+    Returns:
+        The hex SHA-256 digest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_range_contents(contents: Iterable[bytes]) -> list[str]:
+    """Hash many range payloads in one pass.
+
+    The constructor lookup is hoisted out of the loop; the digest itself
+    runs in OpenSSL (SHA-NI accelerated where the CPU supports it), so
+    per-call Python overhead is what's left to amortize.
+
+    Args:
+        contents: Raw content for each range.
+
+    Returns:
+        Hex SHA-256 digests, one per input.
+    """
+    sha256 = hashlib.sha256
+    return [sha256(data).hexdigest() for data in contents]
+
+
+@lru_cache(maxsize=1024)
+def _rel_cached(absolute_path: str, root_str: str) -> str:
+    """Compute a relative path; cached since hot files repeat per session.
+
+    Paths under the root (the common case) are relativized with a plain
+    string prefix strip; only mismatches pay for Path parsing.
+    """
+    prefix = root_str if root_str.endswith(os.sep) else root_str + os.sep
+    if absolute_path.startswith(prefix):
+        return absolute_path[len(prefix) :]
+    try:
+        return str(Path(absolute_path).relative_to(root_str))
+    except ValueError:
+        return absolute_path
 
 
 def to_relative_path(absolute_path: str, root: Path) -> str:
     """Convert absolute path to relative path from repo root.
 
+    Repeated edits hit the same paths, so the Path construction and
+    relative_to walk are memoized on (path, root).
+
     Args:
         absolute_path: Absolute file path.
         root: Root directory to make path relative to.
@@ -118,52 +328,294 @@ def to_relative_path(absolute_path: str, root: Path) -> str:
     Returns:
         Relative path string.
     """
-    try:
-        return str(Path(absolute_path).relative_to(root))
-    except ValueError:
-        return absolute_path
+    return _rel_cached(absolute_path, str(root))
 
 
-def write_event_record(
+def make_record_template(git_revision: str | None = None) -> dict[str, object]:
+    """Build the static part of a JSONL record, shared across events.
+
+    Args:
+        git_revision: Current git SHA; looked up (cached) when omitted.
+
+    Returns:
+        The fields that never change within a tracer's lifetime.
+    """
+    return {
+        "version": "1.2",
+        "vcs": {"type": "git", "revision": git_revision or get_git_revision()},
+    }
+
+
+def build_event_record(
     event: TraceEvent,
     workspace_root: Path,
-) -> None:
-    """Write a trace event record to the JSONL file.
+    git_revision: str | None = None,
+    template: dict[str, object] | None = None,
+    relative_path: str | None = None,
+) -> dict[str, object]:
+    """Build the JSONL record dict for a trace event.
 
     Args:
         event: The trace event to record.
         workspace_root: The workspace root directory.
-    """
-    trace_path = workspace_root / TRACE_FILE
-
-    trace_path.parent.mkdir(parents=True, exist_ok=True)
+        git_revision: Current git SHA; looked up (cached) when omitted.
+        template: Pre-built static fields (see make_record_template);
+            copying it beats rebuilding the constant keys per event.
+        relative_path: The already-relativized file path, when the
+            caller computed it for its own use; derived here otherwise.
 
+    Returns:
+        The record dict in the v1.2 trace schema.
+    """
     # Build file info if present
     file_info = None
     if event.file_path:
-        relative_path = to_relative_path(event.file_path, workspace_root)
+        if relative_path is None:
+            relative_path = to_relative_path(event.file_path, workspace_root)
         file_info = {
             "path": relative_path,
-            "ranges": [{"start_line": r.start_line, "end_line": r.end_line} for r in event.ranges]
-            if event.ranges
-            else [],
+            # content_hash is emitted only when known, keeping the common
+            # hashless range at two keys.
+            "ranges": [
+                {"start_line": r.start_line, "end_line": r.end_line, "content_hash": r.content_hash}
+                if r.content_hash is not None
+                else {"start_line": r.start_line, "end_line": r.end_line}
+                for r in event.ranges
+            ],
         }
 
-    record = {
-        "version": "1.1",
-        "id": str(uuid4()),
-        "event_type": str(event.event_type),
-        "timestamp": datetime.now(UTC).isoformat(),
+    record = dict(template) if template is not None else make_record_template(git_revision)
+    record.update({
+        # .hex skips the dash formatting str(uuid4()) pays per event.
+        "id": uuid4().hex,
+        # Precomputed member -> value tables skip the enum __str__ /
+        # .value descriptor hops per event.
+        "event_type": event_type_value(event.event_type),
+        # v1.2: nanoseconds since the epoch — an integer serializes in a
+        # fraction of the bytes of an ISO string, costs no formatting,
+        # and sorts numerically without parsing.
+        "timestamp_ns": time.time_ns(),
         "session_id": event.session_id,
-        "vcs": {"type": "git", "revision": get_git_revision()},
         "contributor": {
-            "type": event.contributor.type.value,
+            "type": contributor_type_value(event.contributor.type),
             "model_id": event.contributor.model_id,
         },
         "file": file_info,
         "tool_name": event.tool_name,
         "metadata": event.metadata or {},
-    }
+    })
+    return record
+
+
+def write_event_record(
+    event: TraceEvent,
+    workspace_root: Path,
+) -> None:
+    """Write a trace event record to the JSONL file synchronously.
+
+    Args:
+        event: The trace event to record.
+        workspace_root: The workspace root directory.
+    """
+    trace_path = workspace_root / TRACE_FILE
+    trace_path.parent.mkdir(parents=True, exist_ok=True)
+
+    record = build_event_record(event, workspace_root)
+    with trace_path.open("ab") as f:
+        f.write(dumps_line(record))
+
+
+class _Reopen:
+    """Queue marker telling the writer thread to retire its descriptor."""
 
-    with trace_path.open("a") as f:
-        f.write(json.dumps(record) + "\n")
+
+_REOPEN = _Reopen()
+
+
+class TraceFileWriter:
+    """Background JSONL writer that batches appends off the caller's thread.
+
+    Records are enqueued by producers and drained by a daemon thread that
+    serializes them into a single buffer, flushing with one append per
+    batch (size threshold or timer) instead of one write syscall per
+    event. Appends use O_APPEND so concurrent writers stay atomic.
+    """
+
+    #: Flush once the pending buffer reaches this many bytes.
+    FLUSH_BYTES = 64 * 1024
+    #: Flush once this many records are pending, whatever their size.
+    FLUSH_RECORDS = 128
+    #: Flush at least this often (seconds) while records are pending.
+    FLUSH_INTERVAL = 0.2
+
+    def __init__(self, workspace_root: Path) -> None:
+        """Initialize the writer and start its background thread.
+
+        Args:
+            workspace_root: The workspace root directory.
+        """
+        trace_path = workspace_root / TRACE_FILE
+        # Resolve the directory and keep one fd for the writer's lifetime;
+        # flushes then skip path resolution and the open/close syscall
+        # pair. The path is kept as a plain str — no Path re-allocation
+        # when the fd has to be (re)opened.
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self._trace_path = os.fspath(trace_path)
+        self._fd: int | None = None
+        self._queue: queue.SimpleQueue[dict[str, object] | threading.Event | _Reopen | None] = (
+            queue.SimpleQueue()
+        )
+        self._thread = threading.Thread(target=self._run, name="agent-trace-writer", daemon=True)
+        self._thread.start()
+        # Drain whatever is still queued when the interpreter exits,
+        # mirroring BatchSpanProcessor shutdown semantics.
+        atexit.register(self.close)
+
+    def enqueue(self, record: dict[str, object]) -> None:
+        """Queue a record for writing; returns without touching the disk.
+
+        Args:
+            record: The record dict to append as one JSONL line.
+        """
+        self._queue.put(record)
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        """Block until all records enqueued so far are on disk.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            True if the flush completed within the timeout.
+        """
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        return flushed.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending records and stop the background thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to exit.
+        """
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def reopen(self) -> None:
+        """Reopen the trace file on the next flush (e.g. after rotation).
+
+        Routed through the queue — like force_flush's Event marker — so
+        the writer thread retires the descriptor itself between flushes;
+        closing it here would race an in-flight writev. Records enqueued
+        before this call still land in the old file.
+        """
+        self._queue.put(_REOPEN)
+
+    def __del__(self) -> None:
+        """Close the cached fd if the writer is garbage-collected."""
+        if self._fd is not None:  # pragma: no cover - interpreter shutdown path
+            with contextlib.suppress(OSError):
+                os.close(self._fd)
+
+    def _run(self) -> None:
+        """Drain the queue, batching records into single appends."""
+        buffer: list[bytes] = []
+        pending = 0
+        # Monotonic time by which the current buffer must be on disk;
+        # None while the buffer is empty. Fixed when the first record
+        # lands so a steady trickle cannot defer durability past
+        # FLUSH_INTERVAL by keeping the queue busy.
+        deadline: float | None = None
+
+        while True:
+            if deadline is None:
+                # Nothing buffered (every flush drains fully), so there
+                # is nothing a timeout could make durable — block until
+                # work arrives rather than waking FLUSH_INTERVAL-ly idle.
+                item = self._queue.get()
+            else:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    pending = self._flush(buffer)
+                    deadline = None
+                    continue
+
+            if item is None:
+                self._flush(buffer)
+                return
+
+            if isinstance(item, threading.Event):
+                # Everything enqueued before this marker is already in the
+                # buffer (the queue is FIFO), so one flush satisfies it.
+                pending = self._flush(buffer)
+                deadline = None
+                item.set()
+                continue
+
+            if isinstance(item, _Reopen):
+                # Drain what belongs to the old file, then close the fd
+                # here — on the only thread that writes through it.
+                pending = self._flush(buffer)
+                deadline = None
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                continue
+
+            buffer.append(dumps_line(item))
+            pending += len(buffer[-1])
+            if deadline is None:
+                deadline = time.monotonic() + self.FLUSH_INTERVAL
+            if (
+                pending >= self.FLUSH_BYTES
+                or len(buffer) >= self.FLUSH_RECORDS
+                or time.monotonic() >= deadline
+            ):
+                pending = self._flush(buffer)
+                deadline = None
+
+    def _flush(self, buffer: list[bytes]) -> int:
+        """Append the buffered lines in a single write, if any.
+
+        Args:
+            buffer: Serialized lines to write; cleared on return.
+
+        Returns:
+            The new pending byte count (always 0).
+        """
+        if buffer:
+            if self._fd is None:
+                flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+                flags |= getattr(os, "O_CLOEXEC", 0)
+                self._fd = os.open(self._trace_path, flags, 0o644)
+            self._write_buffers(self._fd, buffer)
+            buffer.clear()
+        return 0
+
+    @staticmethod
+    def _write_buffers(fd: int, buffer: list[bytes]) -> None:
+        """Write the buffered lines to an fd, vectored where supported.
+
+        os.writev hands the kernel the line list directly, skipping the
+        memcpy a b"".join concatenation would pay per flush.
+
+        Args:
+            fd: Open file descriptor (O_APPEND).
+            buffer: Serialized lines to write.
+        """
+        if not _HAS_WRITEV:  # pragma: no cover - non-POSIX fallback
+            os.write(fd, b"".join(buffer))
+            return
+
+        for start in range(0, len(buffer), _IOV_MAX):
+            iov = buffer[start : start + _IOV_MAX]
+            written = os.writev(fd, iov)
+            remainder = sum(map(len, iov)) - written
+            if remainder:  # pragma: no cover - partial writes to regular files are rare
+                rest = b"".join(iov)[written:]
+                while rest:
+                    rest = rest[os.write(fd, rest) :]
@@ -0,0 +1,43 @@
+"""Shared fixtures for the agent_trace test suite."""
+
+import copy
+import os
+from collections.abc import Callable, Iterator
+
+import pytest
+
+from agent_trace.tracer import AgentTracer
+
+
+@pytest.fixture(scope="session")
+def _tracer_template() -> AgentTracer:
+    """Build the expensive no-export tracer once per test session."""
+    return AgentTracer(file_export=False, console_export=False)
+
+
+@pytest.fixture
+def no_export_tracer(_tracer_template: AgentTracer) -> AgentTracer:
+    """A no-export tracer per test: a shallow copy of the session template.
+
+    The copy shares the (stateless) cached config but keeps tests free
+    to mutate instance attributes without leaking into each other.
+    """
+    return copy.copy(_tracer_template)
+
+
+@pytest.fixture
+def env_override() -> Iterator[Callable[[str, str], None]]:
+    """Set environment variables directly, restoring them on teardown."""
+    saved: dict[str, str | None] = {}
+
+    def _set(key: str, value: str) -> None:
+        if key not in saved:
+            saved[key] = os.environ.get(key)
+        os.environ[key] = value
+
+    yield _set
+    for key, old in saved.items():
+        if old is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = old
@@ -0,0 +1,88 @@
+"""Tests for the CLI hook entrypoint."""
+
+import io
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from agent_trace import cli
+from agent_trace import tracer as tracer_module
+from agent_trace.constants import ENV_DAEMON, ENV_SOCKET
+
+
+class _FakeStdin:
+    """Stand-in for sys.stdin exposing raw bytes via .buffer."""
+
+    def __init__(self, raw: bytes) -> None:
+        self.buffer = io.BytesIO(raw)
+
+
+@pytest.fixture
+def _isolated_tracer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Point the CLI tracer at tmp_path and keep its caches test-local."""
+    monkeypatch.setattr(tracer_module, "get_workspace_root", lambda: tmp_path)
+    monkeypatch.setattr(tracer_module, "get_git_revision", lambda: "abc123")
+    # No daemon: the socket path points at nothing, so forward() fails over
+    # to in-process handling, and auto-spawn stays off.
+    monkeypatch.setenv(ENV_SOCKET, str(tmp_path / "no-daemon.sock"))
+    monkeypatch.delenv(ENV_DAEMON, raising=False)
+    cli._get_cli_tracer.cache_clear()
+    tracer_module._build_tracer.cache_clear()
+    yield tmp_path
+    cli._get_cli_tracer.cache_clear()
+    tracer_module._build_tracer.cache_clear()
+
+
+def _run_main(monkeypatch: pytest.MonkeyPatch, payload: bytes) -> None:
+    monkeypatch.setattr(cli.sys, "stdin", _FakeStdin(payload))
+    cli.main()
+
+
+class TestMain:
+    """Tests for cli.main."""
+
+    def test_empty_stdin_is_ignored(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test blank input returns without building a tracer."""
+        monkeypatch.setattr(cli, "_get_cli_tracer", lambda: pytest.fail("tracer built"))
+        _run_main(monkeypatch, b"  \n")
+
+    def test_untracked_event_short_circuits(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the peek decoder drops uninteresting events pre-tracer."""
+        monkeypatch.setattr(cli, "_get_cli_tracer", lambda: pytest.fail("tracer built"))
+        _run_main(monkeypatch, b'{"hook_event_name": "SessionStart"}')
+
+    def test_invalid_json_exits_nonzero(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test malformed input exits with status 1."""
+        with pytest.raises(SystemExit, match="1"):
+            _run_main(monkeypatch, b"{not json")
+
+    def test_tracked_edit_writes_record(
+        self, _isolated_tracer: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a PostToolUse Write hook lands in the JSONL trace file."""
+        tmp_path = _isolated_tracer
+        payload = json.dumps({
+            "hook_event_name": "PostToolUse",
+            "tool_name": "Write",
+            "session_id": "sess-cli",
+            "model": "claude-sonnet-4-20250514",
+            "tool_input": {
+                "file_path": str(tmp_path / "src" / "app.py"),
+                "new_string": "line one\nline two",
+            },
+        }).encode()
+
+        _run_main(monkeypatch, payload)
+
+        trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+        record = json.loads(trace_file.read_text().splitlines()[0])
+        assert record["event_type"] == "file_edit"
+        assert record["session_id"] == "sess-cli"
+        assert record["tool_name"] == "Write"
+        assert record["file"]["path"] == "src/app.py"
+        (range_,) = record["file"]["ranges"]
+        assert range_["start_line"] == 1
+        assert range_["end_line"] == 2
+        assert len(range_["content_hash"]) == 64
@@ -0,0 +1,126 @@
+"""Tests for the Unix-socket daemon."""
+
+import json
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from agent_trace import daemon
+from agent_trace import tracer as tracer_module
+from agent_trace.constants import ENV_SOCKET
+
+
+class TestSocketPath:
+    """Tests for per-workspace socket resolution."""
+
+    def test_env_override_wins(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test AGENT_TRACE_SOCKET overrides the derived path."""
+        override = tmp_path / "custom.sock"
+        monkeypatch.setenv(ENV_SOCKET, str(override))
+        assert daemon.socket_path() == override
+
+    def test_scoped_per_workspace(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test distinct workspaces resolve distinct sockets."""
+        monkeypatch.delenv(ENV_SOCKET, raising=False)
+        path_a = daemon.socket_path(Path("/workspaces/project-a"))
+        path_b = daemon.socket_path(Path("/workspaces/project-b"))
+        assert path_a != path_b
+        assert path_a == daemon.socket_path(Path("/workspaces/project-a"))
+        assert f"-{os.getuid()}-" in path_a.name
+
+
+class TestForward:
+    """Tests for the client-side payload handoff."""
+
+    def test_no_daemon_returns_false(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test forward fails over when no daemon is listening."""
+        monkeypatch.setenv(ENV_SOCKET, str(tmp_path / "absent.sock"))
+        assert daemon.forward(b"{}") is False
+
+    def test_roundtrip_with_listener(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test forward delivers the payload and reads the ack."""
+        sock_path = tmp_path / "fake-daemon.sock"
+        monkeypatch.setenv(ENV_SOCKET, str(sock_path))
+        received = []
+
+        def listen() -> None:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+                server.bind(os.fspath(sock_path))
+                server.listen()
+                conn, _ = server.accept()
+                with conn:
+                    received.append(daemon._read_payload(conn))
+                    conn.sendall(b"1")
+
+        thread = threading.Thread(target=listen, daemon=True)
+        thread.start()
+        _wait_for(sock_path.exists)
+
+        assert daemon.forward(b'{"hook_event_name": "PostToolUse"}') is True
+        thread.join(timeout=5.0)
+        assert received == [b'{"hook_event_name": "PostToolUse"}']
+
+
+class TestServe:
+    """Integration tests for the accept loop."""
+
+    @pytest.fixture
+    def _served_workspace(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+        """Run serve() against tmp_path in a background thread."""
+        sock_path = tmp_path / "daemon.sock"
+        monkeypatch.setenv(ENV_SOCKET, str(sock_path))
+        monkeypatch.setattr(tracer_module, "get_workspace_root", lambda: tmp_path)
+        monkeypatch.setattr(tracer_module, "get_git_revision", lambda: "abc123")
+        tracer_module._build_tracer.cache_clear()
+        threading.Thread(target=daemon.serve, daemon=True).start()
+        _wait_for(sock_path.exists)
+        yield tmp_path
+        tracer_module._build_tracer.cache_clear()
+
+    def test_serve_records_forwarded_hook(self, _served_workspace: Path) -> None:
+        """Test a forwarded hook ends up in the workspace trace file."""
+        tmp_path = _served_workspace
+        payload = json.dumps({
+            "hook_event_name": "PostToolUse",
+            "tool_name": "Edit",
+            "session_id": "sess-daemon",
+            "tool_input": {
+                "file_path": str(tmp_path / "src" / "app.py"),
+                "new_string": "x = 1\n",
+            },
+        }).encode()
+
+        assert daemon.forward(payload) is True
+        # The daemon holds the (cached) tracer; flush through it.
+        assert tracer_module.get_tracer(file_export=True, console_export=False).force_flush()
+
+        trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+        record = json.loads(trace_file.read_text().splitlines()[0])
+        assert record["event_type"] == "file_edit"
+        assert record["session_id"] == "sess-daemon"
+        assert record["file"]["path"] == "src/app.py"
+
+    def test_serve_ignores_malformed_payload(self, _served_workspace: Path) -> None:
+        """Test malformed JSON gets no ack and leaves no record."""
+        assert daemon.forward(b"{not json") is False
+
+    def test_serve_yields_to_running_daemon(self, _served_workspace: Path) -> None:
+        """Test a second serve() exits without stealing a live socket."""
+        daemon.serve()
+        assert daemon.forward(b'{"hook_event_name": "SessionStart"}') is True
+
+
+def _wait_for(condition: Callable[[], object], timeout: float = 5.0) -> None:
+    """Poll a zero-argument callable until truthy or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.01)
+    msg = "condition not met within timeout"
+    raise TimeoutError(msg)
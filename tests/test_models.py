@@ -37,6 +37,12 @@ class TestFileRange:
         with pytest.raises(ValidationError):
             FileRange(start_line=1, end_line=0)
 
+    def test_from_pairs(self) -> None:
+        """Test bulk conversion of (start, end) pairs."""
+        ranges = FileRange.from_pairs([(1, 10), (20, 25)])
+        assert [(r.start_line, r.end_line) for r in ranges] == [(1, 10), (20, 25)]
+        assert all(r.content_hash is None for r in ranges)
+
 
 class TestContributor:
     """Tests for Contributor model."""
@@ -1,10 +1,18 @@
 """Tests for agent_trace.tracer."""
 
-import json
 import os
+from collections.abc import Callable
 from pathlib import Path
-from unittest.mock import patch
+from typing import ClassVar
 
+import pytest
+
+try:
+    from orjson import loads
+except ImportError:  # pragma: no cover - optional speedup
+    from json import loads
+
+from agent_trace import tracer as tracer_module
 from agent_trace.models import (
     Contributor,
     ContributorType,
@@ -20,42 +28,47 @@ from agent_trace.utils import (
     to_relative_path,
 )
 
+# Immutable model instances shared across tests; constructed (and
+# validated) once at import instead of per test.
+_AI_CONTRIBUTOR = Contributor(type=ContributorType.AI)
+_RANGE_1_10 = FileRange(start_line=1, end_line=10)
+_PROJECT_ROOT = Path("/home/user/project")
+_HOOK_SESSION_START = HookInput(hook_event_name="SessionStart")
+_HOOK_READ_TOOL = HookInput(hook_event_name="PostToolUse", tool_name="Read")
 
-class TestNormalizeModelId:
-    """Tests for model ID normalization."""
 
-    def test_none_input(self) -> None:
-        """Test None returns None."""
-        assert normalize_model_id(None) is None
+class _AttrPatch:
+    """Swap an object attribute for the block; far cheaper than mock.patch."""
 
-    def test_already_normalized(self) -> None:
-        """Test already normalized model ID."""
-        assert (
-            normalize_model_id("anthropic/claude-opus-4-5-20251101")
-            == "anthropic/claude-opus-4-5-20251101"
-        )
+    __slots__ = ("name", "new", "obj", "old")
 
-    def test_claude_prefix(self) -> None:
-        """Test Claude model normalization."""
-        assert (
-            normalize_model_id("claude-sonnet-4-20250514") == "anthropic/claude-sonnet-4-20250514"
-        )
+    def __init__(self, obj: object, name: str, new: object) -> None:
+        self.obj, self.name, self.new = obj, name, new
 
-    def test_gpt_prefix(self) -> None:
-        """Test GPT model normalization."""
-        assert normalize_model_id("gpt-4o") == "openai/gpt-4o"
+    def __enter__(self) -> None:
+        self.old = getattr(self.obj, self.name)
+        setattr(self.obj, self.name, self.new)
 
-    def test_o1_prefix(self) -> None:
-        """Test o1 model normalization."""
-        assert normalize_model_id("o1-preview") == "openai/o1-preview"
+    def __exit__(self, *exc: object) -> None:
+        setattr(self.obj, self.name, self.old)
 
-    def test_gemini_prefix(self) -> None:
-        """Test Gemini model normalization."""
-        assert normalize_model_id("gemini-pro") == "google/gemini-pro"
 
-    def test_unknown_model(self) -> None:
-        """Test unknown model passes through."""
-        assert normalize_model_id("some-other-model") == "some-other-model"
+class TestNormalizeModelId:
+    """Tests for model ID normalization."""
+
+    def test_normalize_model_id(self) -> None:
+        """Test normalization across providers, passthroughs, and None."""
+        cases = [
+            (None, None),
+            ("anthropic/claude-opus-4-5-20251101", "anthropic/claude-opus-4-5-20251101"),
+            ("claude-sonnet-4-20250514", "anthropic/claude-sonnet-4-20250514"),
+            ("gpt-4o", "openai/gpt-4o"),
+            ("o1-preview", "openai/o1-preview"),
+            ("gemini-pro", "google/gemini-pro"),
+            ("some-other-model", "some-other-model"),
+        ]
+        for raw, expected in cases:
+            assert normalize_model_id(raw) == expected, raw
 
 
 class TestToRelativePath:
@@ -63,13 +76,11 @@ class TestToRelativePath:
 
     def test_relative_conversion(self) -> None:
         """Test converting absolute to relative path."""
-        root = Path("/home/user/project")
-        assert to_relative_path("/home/user/project/src/main.py", root) == "src/main.py"
+        assert to_relative_path("/home/user/project/src/main.py", _PROJECT_ROOT) == "src/main.py"
 
     def test_path_outside_root(self) -> None:
         """Test path outside root returns original."""
-        root = Path("/home/user/project")
-        result = to_relative_path("/other/path/file.py", root)
+        result = to_relative_path("/other/path/file.py", _PROJECT_ROOT)
         assert result == "/other/path/file.py"
 
 
@@ -78,21 +89,21 @@ class TestGetEnvBool:
 
     def test_default_when_not_set(self) -> None:
         """Test default value when env var not set."""
-        with patch.dict(os.environ, {}, clear=True):
-            assert get_env_bool("NONEXISTENT_VAR", default=True) is True
-            assert get_env_bool("NONEXISTENT_VAR", default=False) is False
+        os.environ.pop("NONEXISTENT_VAR", None)
+        assert get_env_bool("NONEXISTENT_VAR", default=True) is True
+        assert get_env_bool("NONEXISTENT_VAR", default=False) is False
 
-    def test_true_values(self) -> None:
+    @pytest.mark.parametrize("value", ["true", "True", "TRUE", "1", "yes", "YES"])
+    def test_true_values(self, value: str, env_override: Callable[[str, str], None]) -> None:
         """Test various true values."""
-        for value in ("true", "True", "TRUE", "1", "yes", "YES"):
-            with patch.dict(os.environ, {"TEST_VAR": value}):
-                assert get_env_bool("TEST_VAR", default=False) is True
+        env_override("TEST_VAR", value)
+        assert get_env_bool("TEST_VAR", default=False) is True
 
-    def test_false_values(self) -> None:
+    @pytest.mark.parametrize("value", ["false", "False", "0", "no", "anything"])
+    def test_false_values(self, value: str, env_override: Callable[[str, str], None]) -> None:
         """Test various false values."""
-        for value in ("false", "False", "0", "no", "anything"):
-            with patch.dict(os.environ, {"TEST_VAR": value}):
-                assert get_env_bool("TEST_VAR", default=True) is False
+        env_override("TEST_VAR", value)
+        assert get_env_bool("TEST_VAR", default=True) is False
 
 
 class TestAgentTracer:
@@ -107,35 +118,25 @@ class TestAgentTracer:
         )
         assert tracer._file_export is False
 
-    def test_trace_event(self) -> None:
+    def test_trace_event(self, no_export_tracer: AgentTracer) -> None:
         """Test recording a trace event."""
-        tracer = AgentTracer(file_export=False, console_export=False)
+        tracer = no_export_tracer
         event = TraceEvent(
             event_type="test_event",
             file_path="src/test.py",
-            contributor=Contributor(type=ContributorType.AI),
+            contributor=_AI_CONTRIBUTOR,
         )
         # Should not raise
         tracer.trace_event(event)
 
-    def test_handle_hook_filters_events(self) -> None:
-        """Test that non-file-modifying events are filtered."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-
-        # SessionStart should be ignored
-        hook = HookInput(hook_event_name="SessionStart")
-        tracer.handle_hook(hook)  # Should not raise
-
-    def test_handle_hook_filters_tools(self) -> None:
-        """Test that non-edit tools are filtered."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-
-        # Read tool should be ignored
-        hook = HookInput(
-            hook_event_name="PostToolUse",
-            tool_name="Read",
-        )
-        tracer.handle_hook(hook)  # Should not raise
+    @pytest.mark.parametrize(
+        "hook",
+        [_HOOK_SESSION_START, _HOOK_READ_TOOL],
+        ids=["non_file_event", "non_edit_tool"],
+    )
+    def test_handle_hook_filters(self, no_export_tracer: AgentTracer, hook: HookInput) -> None:
+        """Test that non-file-modifying events and non-edit tools are filtered."""
+        no_export_tracer.handle_hook(hook)  # Should not raise
 
 
 class TestTraceFileExport:
@@ -145,54 +146,62 @@ class TestTraceFileExport:
         """Test trace file is created with correct format."""
         trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
 
+        # Direct attribute swap: no MagicMock machinery on a path every
+        # export test exercises.
         with (
-            patch("agent_trace.tracer.get_workspace_root", return_value=tmp_path),
-            patch("agent_trace.utils.get_git_revision", return_value="abc123"),
+            _AttrPatch(tracer_module, "get_workspace_root", lambda: tmp_path),
+            _AttrPatch(tracer_module, "get_git_revision", lambda: "abc123"),
         ):
             tracer = AgentTracer(file_export=True, console_export=False)
             tracer.trace_file_edit(
                 file_path=str(tmp_path / "src" / "main.py"),
-                ranges=[FileRange(start_line=1, end_line=10)],
+                ranges=[_RANGE_1_10],
                 model="claude-sonnet-4-20250514",
                 tool_name="Write",
                 session_id="session-123",
             )
+            assert tracer.force_flush()
 
         assert trace_file.exists()
 
-        with trace_file.open() as f:
-            record = json.loads(f.readline())
-
-        # New v1.1 schema
-        assert record["version"] == "1.1"
-        assert record["event_type"] == "file_edit"
-        assert record["session_id"] == "session-123"
-        assert record["vcs"]["revision"] == "abc123"
-        assert record["file"]["path"] == "src/main.py"
-        assert record["file"]["ranges"] == [{"start_line": 1, "end_line": 10}]
-        assert record["contributor"]["model_id"] == "anthropic/claude-sonnet-4-20250514"
-        assert record["contributor"]["type"] == "ai"
+        # Read bytes once; orjson parses bytes directly.
+        record = loads(trace_file.read_bytes().split(b"\n", 1)[0])
+
+        # Pull out the nondeterministic fields, then compare the whole
+        # v1.2 record against one snapshot instead of key-by-key.
+        assert isinstance(record.pop("id"), str)
+        assert isinstance(record.pop("timestamp_ns"), int)
+        assert record == {
+            "version": "1.2",
+            "vcs": {"type": "git", "revision": "abc123"},
+            "event_type": "file_edit",
+            "session_id": "session-123",
+            "contributor": {"type": "ai", "model_id": "anthropic/claude-sonnet-4-20250514"},
+            "file": {"path": "src/main.py", "ranges": [{"start_line": 1, "end_line": 10}]},
+            "tool_name": "Write",
+            "metadata": {},
+        }
 
     def test_all_event_types_write_to_file(self, tmp_path: Path) -> None:
         """Test that all event types write to the JSONL file."""
         trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
 
         with (
-            patch("agent_trace.tracer.get_workspace_root", return_value=tmp_path),
-            patch("agent_trace.utils.get_git_revision", return_value="abc123"),
+            _AttrPatch(tracer_module, "get_workspace_root", lambda: tmp_path),
+            _AttrPatch(tracer_module, "get_git_revision", lambda: "abc123"),
         ):
             tracer = AgentTracer(file_export=True, console_export=False)
 
-            # Test multiple event types
-            tracer.trace_session_start(session_id="sess-1", model="claude-opus-4-20250514")
-            tracer.trace_file_create(file_path="test.py", model="claude-sonnet-4-20250514")
-            tracer.trace_command_run(command="pytest", model="gpt-4o")
-            tracer.trace_session_end(session_id="sess-1")
+            # Test multiple event types, committed in one flush cycle.
+            with tracer.batch_writes():
+                tracer.trace_session_start(session_id="sess-1", model="claude-opus-4-20250514")
+                tracer.trace_file_create(file_path="test.py", model="claude-sonnet-4-20250514")
+                tracer.trace_command_run(command="pytest", model="gpt-4o")
+                tracer.trace_session_end(session_id="sess-1")
 
         assert trace_file.exists()
 
-        with trace_file.open() as f:
-            records = [json.loads(line) for line in f]
+        records = [loads(line) for line in trace_file.read_bytes().splitlines()]
 
         assert len(records) == 4
         assert records[0]["event_type"] == "session_start"
@@ -208,141 +217,128 @@ class TestTraceFileExport:
 class TestEventTracingMethods:
     """Tests for convenience event tracing methods."""
 
-    def test_trace_file_create(self) -> None:
-        """Test file creation tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_file_create(
-            file_path="src/new_file.py",
-            model="claude-sonnet-4-20250514",
-            tool_name="Write",
-            session_id="session-123",
-            line_count=50,
-        )
-        # Should not raise
-
-    def test_trace_file_delete(self) -> None:
-        """Test file deletion tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_file_delete(
-            file_path="src/old_file.py",
-            model="gpt-4o",
-            session_id="session-456",
-        )
-        # Should not raise
-
-    def test_trace_session_start(self) -> None:
-        """Test session start tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_session_start(
-            session_id="session-789",
-            model="claude-opus-4-20250514",
-            metadata={"workspace": "/home/user/project"},
-        )
-        # Should not raise
-
-    def test_trace_session_end(self) -> None:
-        """Test session end tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_session_end(
-            session_id="session-789",
-            model="claude-opus-4-20250514",
-            metadata={"duration_seconds": 3600, "tokens_used": 15000},
-        )
-        # Should not raise
-
-    def test_trace_code_review(self) -> None:
-        """Test code review tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_code_review(
-            file_path="src/main.py",
-            ranges=[FileRange(start_line=1, end_line=50)],
-            model="claude-sonnet-4-20250514",
-            review_type="security",
-            findings=["SQL injection risk", "Hardcoded credentials"],
-        )
-        # Should not raise
-
-    def test_trace_code_suggestion(self) -> None:
-        """Test code suggestion tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_code_suggestion(
-            file_path="src/utils.py",
-            ranges=[FileRange(start_line=10, end_line=15)],
-            model="gpt-4o",
-            suggestion_type="autocomplete",
-        )
-        # Should not raise
-
-    def test_trace_refactor(self) -> None:
-        """Test refactoring tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_refactor(
-            file_path="src/service.py",
-            ranges=[FileRange(start_line=20, end_line=40)],
-            model="claude-sonnet-4-20250514",
-            refactor_type="extract_method",
-        )
-        # Should not raise
-
-    def test_trace_debug(self) -> None:
-        """Test debugging tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_debug(
-            file_path="src/buggy.py",
-            ranges=[FileRange(start_line=100, end_line=105)],
-            model="claude-opus-4-20250514",
-            issue_type="null_pointer",
-            resolved=True,
-        )
-        # Should not raise
-
-    def test_trace_test_generate(self) -> None:
-        """Test test generation tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_test_generate(
-            file_path="tests/test_service.py",
-            ranges=[FileRange(start_line=1, end_line=100)],
-            model="claude-sonnet-4-20250514",
-            test_framework="pytest",
-            test_count=5,
-        )
-        # Should not raise
-
-    def test_trace_test_run(self) -> None:
-        """Test test run tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_test_run(
-            model="claude-sonnet-4-20250514",
-            session_id="session-123",
-            test_file="tests/test_service.py",
-            passed=10,
-            failed=2,
-            skipped=1,
-        )
-        # Should not raise
-
-    def test_trace_command_run(self) -> None:
-        """Test command execution tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_command_run(
-            command="pytest -v",
-            model="claude-sonnet-4-20250514",
-            session_id="session-123",
-            exit_code=0,
-            working_dir="/home/user/project",
-        )
-        # Should not raise
-
-    def test_trace_custom(self) -> None:
-        """Test custom event tracing."""
-        tracer = AgentTracer(file_export=False, console_export=False)
-        tracer.trace_custom(
-            event_name="deployment",
-            file_path="deploy.yaml",
-            model="claude-opus-4-20250514",
-            metadata={"environment": "staging", "version": "1.2.3"},
-        )
-        # Should not raise
+    # (method name, kwargs) covering every trace_* convenience helper.
+    TRACE_CALLS: ClassVar[list[tuple[str, dict[str, object]]]] = [
+        (
+            "trace_file_create",
+            {
+                "file_path": "src/new_file.py",
+                "model": "claude-sonnet-4-20250514",
+                "tool_name": "Write",
+                "session_id": "session-123",
+                "line_count": 50,
+            },
+        ),
+        (
+            "trace_file_delete",
+            {
+                "file_path": "src/old_file.py",
+                "model": "gpt-4o",
+                "session_id": "session-456",
+            },
+        ),
+        (
+            "trace_session_start",
+            {
+                "session_id": "session-789",
+                "model": "claude-opus-4-20250514",
+                "metadata": {"workspace": "/home/user/project"},
+            },
+        ),
+        (
+            "trace_session_end",
+            {
+                "session_id": "session-789",
+                "model": "claude-opus-4-20250514",
+                "metadata": {"duration_seconds": 3600, "tokens_used": 15000},
+            },
+        ),
+        (
+            "trace_code_review",
+            {
+                "file_path": "src/main.py",
+                "ranges": [FileRange(start_line=1, end_line=50)],
+                "model": "claude-sonnet-4-20250514",
+                "review_type": "security",
+                "findings": ["SQL injection risk", "Hardcoded credentials"],
+            },
+        ),
+        (
+            "trace_code_suggestion",
+            {
+                "file_path": "src/utils.py",
+                "ranges": [FileRange(start_line=10, end_line=15)],
+                "model": "gpt-4o",
+                "suggestion_type": "autocomplete",
+            },
+        ),
+        (
+            "trace_refactor",
+            {
+                "file_path": "src/service.py",
+                "ranges": [FileRange(start_line=20, end_line=40)],
+                "model": "claude-sonnet-4-20250514",
+                "refactor_type": "extract_method",
+            },
+        ),
+        (
+            "trace_debug",
+            {
+                "file_path": "src/buggy.py",
+                "ranges": [FileRange(start_line=100, end_line=105)],
+                "model": "claude-opus-4-20250514",
+                "issue_type": "null_pointer",
+                "resolved": True,
+            },
+        ),
+        (
+            "trace_test_generate",
+            {
+                "file_path": "tests/test_service.py",
+                "ranges": [FileRange(start_line=1, end_line=100)],
+                "model": "claude-sonnet-4-20250514",
+                "test_framework": "pytest",
+                "test_count": 5,
+            },
+        ),
+        (
+            "trace_test_run",
+            {
+                "model": "claude-sonnet-4-20250514",
+                "session_id": "session-123",
+                "test_file": "tests/test_service.py",
+                "passed": 10,
+                "failed": 2,
+                "skipped": 1,
+            },
+        ),
+        (
+            "trace_command_run",
+            {
+                "command": "pytest -v",
+                "model": "claude-sonnet-4-20250514",
+                "session_id": "session-123",
+                "exit_code": 0,
+                "working_dir": "/home/user/project",
+            },
+        ),
+        (
+            "trace_custom",
+            {
+                "event_name": "deployment",
+                "file_path": "deploy.yaml",
+                "model": "claude-opus-4-20250514",
+                "metadata": {"environment": "staging", "version": "1.2.3"},
+            },
+        ),
+    ]
+
+    def test_trace_methods_do_not_raise(self, no_export_tracer: AgentTracer) -> None:
+        """Test every convenience method accepts its documented arguments."""
+        # One test item driven by a plain loop: the per-call kwargs are
+        # the data, and pytest's per-item overhead is paid once.
+        for method_name, kwargs in self.TRACE_CALLS:
+            getattr(no_export_tracer, method_name)(**kwargs)
 
 
 class TestEventType:
@@ -369,6 +365,6 @@ class TestEventType:
         event = TraceEvent(
             event_type=EventType.CODE_REVIEW,
             file_path="src/test.py",
-            contributor=Contributor(type=ContributorType.AI),
+            contributor=_AI_CONTRIBUTOR,
         )
         assert event.event_type == EventType.CODE_REVIEW
@@ -0,0 +1,161 @@
+"""Tests for agent_trace.utils."""
+
+import hashlib
+import time
+from pathlib import Path
+
+import pytest
+
+from agent_trace.models import Contributor, ContributorType, FileRange, TraceEvent
+from agent_trace.utils import (
+    TraceFileWriter,
+    _find_git_dir,
+    _read_git_head,
+    build_event_record,
+    dumps_line,
+    hash_content,
+    hash_range_contents,
+)
+
+_SHA = "a" * 40
+
+
+class TestHashing:
+    """Tests for content hashing helpers."""
+
+    def test_hash_content(self) -> None:
+        """Test hash_content matches a plain SHA-256 hex digest."""
+        data = b"def main():\n    pass\n"
+        assert hash_content(data) == hashlib.sha256(data).hexdigest()
+
+    def test_hash_range_contents(self) -> None:
+        """Test bulk hashing matches per-item hashing."""
+        contents = [b"one", b"two", b"three"]
+        assert hash_range_contents(contents) == [hash_content(data) for data in contents]
+
+
+class TestReadGitHead:
+    """Tests for the subprocess-free HEAD resolution."""
+
+    def test_detached_head(self, tmp_path: Path) -> None:
+        """Test a detached HEAD stores the SHA inline."""
+        (tmp_path / "HEAD").write_text(f"{_SHA}\n")
+        assert _read_git_head(tmp_path) == _SHA
+
+    def test_loose_ref(self, tmp_path: Path) -> None:
+        """Test HEAD pointing at a loose ref file."""
+        (tmp_path / "HEAD").write_text("ref: refs/heads/main\n")
+        (tmp_path / "refs" / "heads").mkdir(parents=True)
+        (tmp_path / "refs" / "heads" / "main").write_text(f"{_SHA}\n")
+        assert _read_git_head(tmp_path) == _SHA
+
+    def test_packed_ref(self, tmp_path: Path) -> None:
+        """Test a ref that only exists in packed-refs."""
+        (tmp_path / "HEAD").write_text("ref: refs/heads/main\n")
+        (tmp_path / "packed-refs").write_text(
+            f"# pack-refs with: peeled fully-peeled sorted\n{_SHA} refs/heads/main\n"
+        )
+        assert _read_git_head(tmp_path) == _SHA
+
+    def test_missing_head(self, tmp_path: Path) -> None:
+        """Test an empty .git directory resolves to None."""
+        assert _read_git_head(tmp_path) is None
+
+    def test_find_git_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the walk up from cwd finds the nearest .git directory."""
+        (tmp_path / ".git").mkdir()
+        nested = tmp_path / "src" / "pkg"
+        nested.mkdir(parents=True)
+        monkeypatch.chdir(nested)
+        _find_git_dir.cache_clear()
+        try:
+            assert _find_git_dir() == tmp_path / ".git"
+        finally:
+            _find_git_dir.cache_clear()
+
+
+class TestBuildEventRecord:
+    """Tests for record construction."""
+
+    def test_content_hash_serialized_when_known(self, tmp_path: Path) -> None:
+        """Test ranges carry content_hash only when it is set."""
+        event = TraceEvent(
+            event_type="file_edit",
+            file_path=str(tmp_path / "src" / "app.py"),
+            ranges=[
+                FileRange(start_line=1, end_line=2, content_hash="cafe"),
+                FileRange(start_line=5, end_line=9),
+            ],
+            contributor=Contributor(type=ContributorType.AI),
+        )
+        record = build_event_record(event, tmp_path, git_revision=_SHA)
+        file_info = record["file"]
+        assert isinstance(file_info, dict)
+        assert file_info["ranges"] == [
+            {"start_line": 1, "end_line": 2, "content_hash": "cafe"},
+            {"start_line": 5, "end_line": 9},
+        ]
+
+
+class TestTraceFileWriter:
+    """Tests for the background JSONL writer."""
+
+    def test_batched_records_reach_disk(self, tmp_path: Path) -> None:
+        """Test enqueued records land as one JSONL line each."""
+        writer = TraceFileWriter(tmp_path)
+        try:
+            for n in range(5):
+                writer.enqueue({"n": n})
+            assert writer.force_flush()
+            trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+            assert trace_file.read_bytes() == b"".join(dumps_line({"n": n}) for n in range(5))
+        finally:
+            writer.close()
+
+    def test_timed_flush_without_force(self, tmp_path: Path) -> None:
+        """Test a lone record hits the disk within the flush interval."""
+        writer = TraceFileWriter(tmp_path)
+        try:
+            writer.enqueue({"n": 0})
+            trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+            deadline = time.monotonic() + 5 * writer.FLUSH_INTERVAL
+            while time.monotonic() < deadline:
+                if trace_file.exists() and trace_file.stat().st_size > 0:
+                    break
+                time.sleep(0.02)
+            assert trace_file.read_bytes() == dumps_line({"n": 0})
+        finally:
+            writer.close()
+
+    def test_reopen_recreates_rotated_file(self, tmp_path: Path) -> None:
+        """Test reopen() targets a fresh file after rotation."""
+        writer = TraceFileWriter(tmp_path)
+        try:
+            writer.enqueue({"n": 0})
+            assert writer.force_flush()
+            trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+            trace_file.unlink()
+            writer.reopen()
+            writer.enqueue({"n": 1})
+            assert writer.force_flush()
+            assert trace_file.read_bytes() == dumps_line({"n": 1})
+        finally:
+            writer.close()
+
+    def test_reopen_with_concurrent_enqueues(self, tmp_path: Path) -> None:
+        """Test reopen() mid-stream loses no records and kills no writer."""
+        writer = TraceFileWriter(tmp_path)
+        try:
+            for n in range(50):
+                writer.enqueue({"n": n})
+                if n == 25:
+                    writer.reopen()
+            assert writer.force_flush()
+            trace_file = tmp_path / ".agent-trace" / "traces.jsonl"
+            lines = trace_file.read_bytes().splitlines()
+            assert len(lines) == 50
+            # The writer thread must survive the descriptor swap.
+            writer.enqueue({"n": 50})
+            assert writer.force_flush()
+        finally:
+            writer.close()